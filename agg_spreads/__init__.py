@@ -1,2 +1,23 @@
+import logging
+
 from .google_handler import GoogleSheet
 from .google_handler import GoogleSheetsObjects
+from .cache import RangeCache
+from .fanout import read_many_files
+from .appender import SheetAppender
+from .provision import provision_many
+from .throttle import RateLimiter
+from .pool import ClientPool
+from .metrics import Metrics
+from .snapshots import SnapshotStore
+from .lazy import enable_logging
+
+logging.getLogger(__name__).addHandler(logging.NullHandler())  # logging is configured by the application
+
+
+def __getattr__(name):
+    """ The async client (and asyncio) is imported only when asked for """
+    if name in ('AsyncGoogleSheet', 'AsyncGoogleSheetsObjects', 'AsyncSheetsSession'):
+        from . import async_handler
+        return getattr(async_handler, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
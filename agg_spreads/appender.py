@@ -0,0 +1,201 @@
+# import libraries
+import time
+import json
+import logging
+import threading
+from collections import deque
+
+from .ranges import quote_title
+from .throttle import is_rejected
+
+logger = logging.getLogger(__name__)
+
+POLICIES = ('block', 'drop', 'drop_oldest')
+
+
+# #############################################################################
+# ####### ———————- APPEND SINK WITH BACKGROUND FLUSHER -——————— ##############
+# #############################################################################
+class SheetAppender(object):
+    """ Rows from many threads / coroutines appended to a tab by a background flusher with values.append
+
+    Rows wait in a bounded queue (max_queue rows) and go out in one call per `max_rows` rows,
+    `max_bytes` of JSON or `max_delay` seconds since the oldest waiting row. When the queue is full,
+    policy 'block' makes producers wait (up to put_timeout), 'drop' drops the new row,
+    'drop_oldest' drops the oldest waiting one. The API finds the next free row, so producers never race.
+    values.append is not idempotent: only 429 refusals are retried, other failures count as failed_rows.
+
+    How to call:
+    with SheetAppender(GoogleSheetTable, max_rows=500, max_delay=2.0, policy='block') as appender:
+        appender.append(['2024-05-01 10:00:01', 'BUY', 'AAPL', 100, 189.5])  # from any thread
+        await appender.append_async(row)  # from a coroutine
+    print(appender.stats())  # close() (end of `with`) flushes everything
+    """
+
+    def __init__(self, table, tab=None, max_rows=500, max_bytes=1024 * 1024, max_delay=2.0, max_queue=10000,
+                 policy='block', put_timeout=None, value_input_option='USER_ENTERED'):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown policy {policy!r}, use one of {POLICIES}")
+        self.table = table  # GoogleSheet
+        self.data_source = table.data_source
+        self.title = tab or table.active_sheet.title  # fixed, switching tabs of the table does not move the sink
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.max_delay = max_delay
+        self.max_queue = max_queue
+        self.policy = policy
+        self.put_timeout = put_timeout  # seconds a blocked producer waits, None — until there is room
+        self.value_input_option = value_input_option
+        self.counters = {'queued': 0, 'appended': 0, 'requests': 0, 'bytes': 0, 'dropped': 0, 'failed_rows': 0,
+                         'blocked_seconds': 0.0, 'queue_peak': 0}
+        self._queue = deque()  # (row, bytes, queued at)
+        self._bytes = 0
+        self._closed = False
+        self._flush_now = False
+        self._in_flight = 0  # rows taken by the flusher and not sent yet
+        self._condition = threading.Condition()
+        self._flusher = threading.Thread(target=self._run, name=f'SheetAppender-{self.title}', daemon=True)
+        self._flusher.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return len(self._queue)
+
+    # ——————————————————————————— PRODUCERS ———————————————————————————
+    def append(self, row, timeout=None):
+        """ Queues one row, returns False if it was dropped (policy 'drop', or 'block' timed out) """
+        row = [value if value is None or isinstance(value, (str, int, float, bool)) else str(value) for value in row]
+        size = len(json.dumps(row)) + 1
+        timeout = self.put_timeout if timeout is None else timeout
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("SheetAppender is closed")
+            if len(self._queue) >= self.max_queue:
+                if self.policy == 'drop':
+                    self.counters['dropped'] += 1
+                    return False
+                if self.policy == 'drop_oldest':
+                    _, dropped_size, _ = self._queue.popleft()
+                    self._bytes -= dropped_size
+                    self.counters['dropped'] += 1
+                else:
+                    started = time.monotonic()
+                    room = self._condition.wait_for(lambda: len(self._queue) < self.max_queue or self._closed,
+                                                    timeout=timeout)
+                    self.counters['blocked_seconds'] += time.monotonic() - started
+                    if not room or self._closed:
+                        self.counters['dropped'] += 1
+                        return False
+            self._queue.append((row, size, time.monotonic()))
+            self._bytes += size
+            self.counters['queued'] += 1
+            self.counters['queue_peak'] = max(self.counters['queue_peak'], len(self._queue))
+            if len(self._queue) == 1 or len(self._queue) >= self.max_rows or self._bytes >= self.max_bytes:
+                self._condition.notify_all()  # the flusher starts the max_delay clock / sends now
+        return True
+
+    def extend(self, rows, timeout=None):
+        """ Queues many rows, returns how many were accepted """
+        return sum(self.append(row, timeout=timeout) for row in rows)
+
+    async def append_async(self, row):
+        """ append() for coroutines: a full 'block' queue waits in a worker thread, not in the event loop """
+        with self._condition:
+            has_room = len(self._queue) < self.max_queue
+        if has_room or self.policy != 'block':
+            return self.append(row)
+        import asyncio
+        return await asyncio.get_running_loop().run_in_executor(None, self.append, row)
+
+    # ——————————————————————————— FLUSHER ———————————————————————————
+    def _due(self):
+        if not self._queue:
+            return False
+        return self._closed or self._flush_now or len(self._queue) >= self.max_rows or \
+            self._bytes >= self.max_bytes or time.monotonic() - self._queue[0][2] >= self.max_delay
+
+    def _take(self):
+        """ Up to max_rows rows / max_bytes from the queue head (at least one row) """
+        rows, size = [], 0
+        while self._queue and len(rows) < self.max_rows:
+            if rows and size + self._queue[0][1] > self.max_bytes:
+                break
+            row, row_size, _ = self._queue.popleft()
+            rows.append(row)
+            size += row_size
+        self._bytes -= size
+        self._in_flight += len(rows)
+        if not self._queue:
+            self._flush_now = False
+        self._condition.notify_all()  # blocked producers have room now
+        return rows, size
+
+    def _run(self):
+        while True:
+            rows = []
+            try:
+                with self._condition:
+                    while not self._due():
+                        if self._closed and not self._queue:
+                            return
+                        timeout = self.max_delay - (time.monotonic() - self._queue[0][2]) if self._queue else None
+                        self._condition.wait(timeout=timeout)
+                    rows, size = self._take()
+                self._send(rows, size)
+            except Exception as e:  # the flusher must outlive any error, blocked producers wait on it
+                logger.error(f"Append flusher: {e}")
+            finally:
+                if rows:
+                    with self._condition:
+                        self._in_flight -= len(rows)
+                        self._condition.notify_all()
+
+    def _send(self, rows, size):
+        """ One values.append, retried only when refused by quota (429): a 5xx or timeout may have appended """
+        sheet_range = f"{quote_title(self.title)}!A1"
+        try:
+            self.data_source.api_call(self.data_source.wks.values_append, sheet_range,
+                                      params={'valueInputOption': self.value_input_option,
+                                              'insertDataOption': 'INSERT_ROWS'},
+                                      body={'values': rows}, retry_if=is_rejected)
+        except Exception as e:
+            logger.error(f"Append of {len(rows)} rows failed, not sent again: {e}")
+            with self._condition:
+                self.counters['requests'] += 1
+                self.counters['failed_rows'] += len(rows)
+            return
+        with self._condition:
+            self.counters['requests'] += 1
+            self.counters['appended'] += len(rows)
+            self.counters['bytes'] += size
+        if self.table.cache is not None:
+            self.table.cache.invalidate(self.table.sheetID, tab=self.title)
+        self.table._forget_version(tab=self.title)
+
+    # ——————————————————————————— LIFETIME ———————————————————————————
+    def flush(self, timeout=None):
+        """ Sends everything queued now, waits until the queue is empty """
+        with self._condition:
+            self._flush_now = bool(self._queue)
+            self._condition.notify_all()
+            return self._condition.wait_for(lambda: not self._queue and not self._in_flight, timeout=timeout)
+
+    def close(self, timeout=None):
+        """ Stops accepting rows, flushes everything and stops the flusher """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._flusher.join(timeout)
+        return self.stats()
+
+    def stats(self):
+        with self._condition:
+            result = dict(self.counters)
+            result.update({'waiting': len(self._queue), 'waiting_bytes': self._bytes,
+                           'blocked_seconds': round(self.counters['blocked_seconds'], 3)})
+            return result
@@ -0,0 +1,542 @@
+# import libraries
+import time
+import json
+import asyncio
+import logging
+import itertools
+from urllib.parse import quote
+
+from .lazy import LazyModule
+from .pool import ClientPool
+from .throttle import RateLimiter, is_retryable, parse_retry_after
+from .ranges import parse_range, range_to_a1, quote_title, grid_range
+
+pd = LazyModule('pandas')
+
+logger = logging.getLogger(__name__)
+
+SHEETS_URL = 'https://sheets.googleapis.com/v4/spreadsheets'
+DRIVE_URL = 'https://www.googleapis.com/drive/v2'
+
+
+class AsyncAPIError(Exception):
+    """ Non-2xx reply of the Sheets / Drive API, `status`, parsed `error` body and `retry_after` attached """
+
+    def __init__(self, status, error, retry_after=None):
+        self.status = status
+        self.error = error
+        self.retry_after = retry_after  # seconds of the Retry-After header, None if absent
+        message = error.get('message', error) if isinstance(error, dict) else error
+        reasons = [item.get('reason') for item in error.get('errors', [])] if isinstance(error, dict) else []
+        reasons = ', '.join(filter(None, reasons))  # e.g. rateLimitExceeded, matched by is_retryable
+        super().__init__(f"Error {status}: {message}" + (f" ({reasons})" if reasons else ''))
+
+
+# #############################################################################
+# ####### ———————- SHARED HTTP SESSION & TOKEN REFRESHER -——————— ############
+# #############################################################################
+class AsyncSheetsSession(object):
+    """ One keep-alive connection pool, one access token and one in-flight limit for many sheets
+
+    How to call:
+    async with AsyncSheetsSession('GoogleSheetAPIKey.json', max_in_flight=20) as session:
+        first = await AsyncGoogleSheet.open('GoogleSheetAPIKey.json', sheetID='<ID 1>', session=session)
+        second = await AsyncGoogleSheet.open('GoogleSheetAPIKey.json', sheetID='<ID 2>', session=session)
+
+    keyfile=None sends no Authorization header (a local fake endpoint), sheets_url / drive_url point to it.
+    Needs `aiohttp` (pip install agg_spreads[async]).
+    """
+
+    def __init__(self, keyfile=None, max_in_flight=10, sheets_url=SHEETS_URL, drive_url=DRIVE_URL,
+                 refresh_ahead=300, timeout=60, pool=None):
+        self.keyfile = keyfile
+        self.max_in_flight = max_in_flight
+        self.sheets_url = sheets_url.rstrip('/')
+        self.drive_url = drive_url.rstrip('/')
+        self.refresh_ahead = refresh_ahead  # seconds before expiry to get a new token
+        self.timeout = timeout
+        self.pool = pool  # ClientPool to take credentials from, ClientPool.shared() by default
+        self.creds = None
+        self.counters = {'requests': 0, 'token_refreshes': 0, 'in_flight_peak': 0}
+        self._session = None
+        self._semaphore = None
+        self._token = None
+        self._token_expires = 0.0
+        self._token_lock = None
+        self._in_flight = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    def _start(self):
+        if self._session is not None:
+            return
+        try:
+            import aiohttp
+        except ImportError:
+            raise ImportError("AsyncGoogleSheet needs aiohttp: pip install aiohttp")
+        connector = aiohttp.TCPConnector(limit=self.max_in_flight, keepalive_timeout=60)
+        self._session = aiohttp.ClientSession(connector=connector,
+                                              timeout=aiohttp.ClientTimeout(total=self.timeout))
+        self._semaphore = asyncio.Semaphore(self.max_in_flight)
+        self._token_lock = asyncio.Lock()
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def _headers(self):
+        """ Authorization header, the token is refreshed once for all waiting coroutines """
+        if self.keyfile is None:
+            return {}
+        async with self._token_lock:
+            if self._token is None or time.monotonic() > self._token_expires - self.refresh_ahead:
+                loop = asyncio.get_running_loop()
+                self._token, expires_in = await loop.run_in_executor(None, self._fetch_token)
+                self._token_expires = time.monotonic() + (expires_in or 3600)
+                self.counters['token_refreshes'] += 1
+        return {'Authorization': f'Bearer {self._token}'}
+
+    def _fetch_token(self):
+        """ Blocking token fetch, runs in the default executor """
+        if self.creds is None:
+            self.creds = (self.pool or ClientPool.shared()).credentials(self.keyfile)
+        if self._token is not None:
+            self.creds.refresh(_http())
+        token = self.creds.get_access_token(_http())
+        return token.access_token, token.expires_in
+
+    async def request(self, method, url, params=None, body=None):
+        """ Sends one API request within the in-flight limit, returns parsed JSON reply """
+        self._start()
+        headers = await self._headers()
+        async with self._semaphore:
+            self._in_flight += 1
+            self.counters['requests'] += 1
+            self.counters['in_flight_peak'] = max(self.counters['in_flight_peak'], self._in_flight)
+            try:
+                async with self._session.request(method, url, params=params, json=body, headers=headers) as resp:
+                    text = await resp.text()
+                    reply = json.loads(text) if text else {}
+                    if resp.status >= 400:
+                        raise AsyncAPIError(resp.status, reply.get('error', reply) if isinstance(reply, dict) else text,
+                                            retry_after=parse_retry_after(resp.headers.get('Retry-After')))
+                    return reply
+            finally:
+                self._in_flight -= 1
+
+    def sheets(self, spreadsheet_id, path=''):
+        return f'{self.sheets_url}/{spreadsheet_id}{path}'
+
+    def values(self, spreadsheet_id, range_a1, suffix=''):
+        return f"{self.sheets_url}/{spreadsheet_id}/values/{quote(range_a1, safe='')}{suffix}"
+
+    def drive(self, path):
+        return f'{self.drive_url}{path}'
+
+
+def _http():
+    import httplib2
+    return httplib2.Http()
+
+
+class AsyncWorksheet(object):
+    """ Tab properties from spreadsheets.get (stands for gspread.Worksheet in the async API) """
+
+    def __init__(self, properties):
+        self.id = properties.get('sheetId', 0)
+        self.title = properties.get('title', '')
+        self.index = properties.get('index', 0)
+        grid = properties.get('gridProperties', {})
+        self.row_count = grid.get('rowCount', 0)
+        self.col_count = grid.get('columnCount', 0)
+
+    def __repr__(self):
+        return f"<AsyncWorksheet '{self.title}' id:{self.id}>"
+
+
+# #############################################################################
+# ####### ———————- ASYNC GOOGLE SHEETS HANDLING CLASS -——————— ###############
+# #############################################################################
+class AsyncGoogleSheetsObjects(object):
+    """ Coroutine twin of GoogleSheetsObjects, talks to the REST API over AsyncSheetsSession
+
+    How to call:
+    GS = AsyncGoogleSheetsObjects('GoogleSheetAPIKey.json')
+    GS_tab = await GS.openWorksheet(fileID='<a long hex Google Sheets ID>', page=0)
+    rows = await GS.readRangeValues(GS_tab, 'A1:C10')
+    await GS.close()
+    """
+
+    def __init__(self, keyfile=None, session=None, cache=None, max_in_flight=10, limiter=None):
+        self.keyfile = keyfile
+        self.limiter = limiter or RateLimiter.shared()  # retry policy (max_retries, backoff) of the sync client
+        self.own_session = session is None
+        self.session = session if session is not None else AsyncSheetsSession(keyfile, max_in_flight=max_in_flight)
+        self.file_title = None  # Google sheet filename (title)
+        self.file_id = None  # Google sheet Google file ID
+        self.worksheets = []  # AsyncWorksheet of every tab, from the last metadata fetch
+        self.workingSheet = None  # a working sheet
+        self.cache = cache  # Read-through cache (RangeCache), optional
+
+    async def close(self):
+        if self.own_session:
+            await self.session.close()
+
+    async def retry_call(self, func, *args, retry_if=None, **kwargs):
+        """ Awaits func(*args, **kwargs), retries the errors of retry_if (default is_retryable) like
+            RateLimiter.call: full jitter backoff, at least Retry-After, the rest is re-raised
+        """
+        retry_if = retry_if or is_retryable
+        for attempt in range(self.limiter.max_retries + 1):
+            try:
+                return await func(*args, **kwargs)
+            except Exception as e:
+                if not retry_if(e) or attempt == self.limiter.max_retries:
+                    raise
+                delay = self.limiter.backoff(attempt, getattr(e, 'retry_after', None))
+                logger.warning(f"API error {getattr(e, 'status', None)}, retry {attempt + 1}/"
+                               f"{self.limiter.max_retries} in {delay:.1f}s: {e}")
+                await asyncio.sleep(delay)
+
+    async def create_file(self, title: str = "Untitled", parent_folder_id: str = None):
+        """ Creates a new Google spreadsheet """
+        file_metadata = {
+            'title': title,
+            'mimeType': 'application/vnd.google-apps.spreadsheet',
+            }
+        file_metadata['parents'] = [{'id': parent_folder_id}] if parent_folder_id else []
+        try:
+            api_response = await self.session.request('POST', self.session.drive('/files'), body=file_metadata)
+            self.file_title = api_response.get('title', None)
+            self.file_id = api_response.get('id', None)
+            logger.info(f"🔗 CREATED: https://docs.google.com/spreadsheets/d/{self.file_id}/edit?usp=drivesdk")
+        except AsyncAPIError as e:
+            logger.error(f"details: {e.error}")
+            return None
+        return await self.openWorksheet(fileID=self.file_id, page=0)
+
+    async def share_file(self, email=None):
+        """ Share file of the file """
+        if not email:
+            return {'details': 'empty email'}
+        new_permissions = {
+            'type': 'group',
+            'role': 'writer',
+            'emailAddress': email,
+            'value': email
+            }
+        try:
+            return await self.session.request('POST', self.session.drive(f'/files/{self.file_id}/permissions'),
+                                              params={'sendNotificationEmails': 'true'}, body=new_permissions)
+        except AsyncAPIError as e:
+            return e.error
+
+    async def change_owner(self, email=None):
+        """ changing owner of the file """
+        if not email:
+            return {'details': 'empty email'}
+        change_owner_permissions = {
+            'type': 'group',
+            'pendingOwner': 'true',
+            'emailAddress': email,
+            'value': email
+            }
+        try:
+            permission_list = await self.session.request('GET', self.session.drive(f'/files/{self.file_id}/permissions'))
+            if not permission_list.get('items'):
+                return {'details': 'no permissions to transfer'}
+            permission_id = permission_list['items'][0]['id']
+            return await self.session.request('PUT', self.session.drive(f'/files/{self.file_id}/permissions/{permission_id}'),
+                                              params={'transferOwnership': 'true'}, body=change_owner_permissions)
+        except AsyncAPIError as e:
+            return e.error
+
+    async def fetch_metadata(self, fileID=None):
+        """ Title of the file and properties of every tab in one spreadsheets.get """
+        reply = await self.session.request('GET', self.session.sheets(fileID or self.file_id),
+                                           params={'fields': 'properties.title,sheets.properties'})
+        self.file_title = reply.get('properties', {}).get('title', self.file_title)
+        self.worksheets = [AsyncWorksheet(sheet['properties']) for sheet in reply.get('sheets', [])]
+        return self.worksheets
+
+    async def openWorksheet(self, fileID='', page=0, tab_name=None):
+        ''' Open Google sheet by ID key '''
+        logger.info("Opening google sheet...")
+        await self.fetch_metadata(fileID)
+        self.file_id = fileID
+        self.workingSheet = self.worksheet(tab_name) if tab_name else self.worksheets[page]
+        logger.info("Opened doc: {}".format(self.file_title))
+        return self.workingSheet
+
+    def worksheet(self, title):
+        for sheet in self.worksheets:
+            if sheet.title == title:
+                return sheet
+        raise KeyError(f"No tab `{title}` in {self.file_id}")
+
+    async def batch_update(self, requests):
+        """ spreadsheets:batchUpdate with a list of requests """
+        return await self.session.request('POST', self.session.sheets(self.file_id, ':batchUpdate'),
+                                          body={'requests': requests})
+
+    async def clearRange(self, google_sheet_pointer, line1=0, line2=0, column1='A', column2='A'):
+        result = None
+        cells = '{}{}:{}{}'.format(column1, line1, column2, line2)
+        try:
+            result = await self.session.request(
+                'POST', self.session.values(self.file_id, f'{quote_title(google_sheet_pointer.title)}!{cells}', ':clear'))
+            if self.cache is not None:
+                self.cache.patch_clear(self.file_id, google_sheet_pointer.title, parse_range(cells))
+        except Exception as e:
+            logger.error(e)
+        return result
+
+    async def readRangeValues(self, google_sheet_pointer, range_a1, render='FORMATTED_VALUE'):
+        """ Rows of the range straight from values.get, trailing empty cells are trimmed by API """
+        sheet_range = '{}!{}'.format(quote_title(google_sheet_pointer.title), range_a1)
+        response = await self.session.request('GET', self.session.values(self.file_id, sheet_range),
+                                              params={'valueRenderOption': render, 'majorDimension': 'ROWS'})
+        return response.get('values', [])
+
+    async def readAllValues(self, google_sheet_pointer, render='FORMATTED_VALUE'):
+        """ Every row of the tab (same as worksheet.get_all_values) """
+        response = await self.session.request('GET', self.session.values(self.file_id, quote_title(google_sheet_pointer.title)),
+                                              params={'valueRenderOption': render, 'majorDimension': 'ROWS'})
+        rows = response.get('values', [])
+        width = max((len(row) for row in rows), default=0)
+        return [row + [''] * (width - len(row)) for row in rows]
+
+    async def updateRangeColor(self, google_sheet_pointer,
+                               column1='B', line1=2,
+                               column2='B', line2=2,
+                               red=0.2, green=0.8, blue=0.2):
+        cell_format = {"backgroundColor": {"red": red, "green": green, "blue": blue}}
+        rect = parse_range('{}{}:{}{}'.format(column1, line1, column2, line2))
+        return await self.batch_update([{'repeatCell': {
+                                            'range': grid_range(google_sheet_pointer.id, rect),
+                                            'cell': {'userEnteredFormat': cell_format},
+                                            'fields': 'userEnteredFormat(backgroundColor)'}}])
+
+    async def saveWorksheetToCSV(self, google_sheet_pointer, filename='googleSheet'):
+        import csv
+        result = {'error': False, 'status': ''}
+        try:
+            rows = await self.readAllValues(google_sheet_pointer)
+            with open(filename + '.csv', 'w', newline='') as f:
+                csv.writer(f).writerows(rows)
+            result['status'] = filename + '.csv'  # if ok, return actual filename
+        except Exception as e:
+            result['error'] = True
+            result['status'] = e
+        return result
+
+    async def add_worksheet(self, title, rows, cols):
+        reply = await self.batch_update([{'addSheet': {'properties': {
+                    'title': title, 'gridProperties': {'rowCount': int(rows), 'columnCount': int(cols)}}}}])
+        sheet = AsyncWorksheet(reply['replies'][0]['addSheet']['properties'])
+        self.worksheets.append(sheet)
+        return sheet
+
+    async def update_range_by_corner(self, google_sheet_pointer, corner='A1', data=[[]]):
+        if not any(len(line) for line in data):
+            return  # empty request (an empty first row alone is fine)
+        row1, col1, *_ = parse_range(corner)
+        rect = (row1, col1, row1 + len(data) - 1, col1 + max(len(row) for row in data) - 1)
+        sheet_range = '{}!{}'.format(quote_title(google_sheet_pointer.title), range_to_a1(rect))
+        result = await self.session.request('PUT', self.session.values(self.file_id, sheet_range),
+                                            params={'valueInputOption': 'USER_ENTERED'},
+                                            body={'range': sheet_range, 'majorDimension': 'ROWS', 'values': data})
+        if self.cache is not None:
+            self.cache.invalidate(self.file_id, google_sheet_pointer.title, rect)
+        return result
+
+
+# #############################################################
+class AsyncGoogleSheet(object):
+    """ Coroutine twin of GoogleSheet (no batch mode), open it with `await AsyncGoogleSheet.open(...)`
+
+        async with AsyncSheetsSession('<API key file.json>', max_in_flight=20) as session:
+            tables = await asyncio.gather(*[AsyncGoogleSheet.open('<API key file.json>', sheetID=sheet_id, session=session)
+                                            for sheet_id in sheet_ids])
+            frames = await asyncio.gather(*[table.read_sheet_to_dataframe() for table in tables])
+    """
+
+    def __init__(self, keyfile, sheetID=None, tab_name=None, title="Untitled", email=None, folder_id=None,
+                 cache=None, session=None, max_in_flight=10, limiter=None):
+        self.active_sheet = None
+        self.row_count = 0
+        self.sheetID = sheetID
+        self.sheetTitle = None
+        self.sheetsList = []
+        self.cache = cache  # RangeCache to serve repeated reads from, optional
+        self.data_source = AsyncGoogleSheetsObjects(keyfile=keyfile, session=session, cache=cache,
+                                                    max_in_flight=max_in_flight, limiter=limiter)
+        self._open_args = (tab_name, title, email, folder_id)
+
+    @classmethod
+    async def open(cls, keyfile, sheetID=None, tab_name=None, title="Untitled", email=None, folder_id=None,
+                   cache=None, session=None, max_in_flight=10, limiter=None):
+        """ Builds the object and opens (or creates and shares) the spreadsheet """
+        sheet = cls(keyfile, sheetID=sheetID, tab_name=tab_name, title=title, email=email, folder_id=folder_id,
+                    cache=cache, session=session, max_in_flight=max_in_flight, limiter=limiter)
+        await sheet._open()
+        return sheet
+
+    async def __aenter__(self):
+        if self.active_sheet is None:
+            await self._open()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def close(self):
+        await self.data_source.close()
+
+    async def _open(self):
+        tab_name, title, email, folder_id = self._open_args
+        if not self.sheetID:
+            # Please, create file
+            if not email:
+                raise Exception("No user email provided to share with — no access to sheet may be given")
+            self.active_sheet = await self.data_source.create_file(title=title, parent_folder_id=folder_id)
+            self.sheetID = self.data_source.file_id
+            logger.info(f'Open sheet ID: `{self.sheetID}`')
+            logger.info(await self.data_source.share_file(email=email))
+            logger.info(await self.data_source.change_owner(email=email))
+        else:
+            logger.info(f'Open sheet ID: `{self.sheetID}`')
+            self.active_sheet = await self.data_source.openWorksheet(fileID=self.sheetID, page=0, tab_name=tab_name)
+        self.sheetTitle = self.active_sheet.title
+        self.row_count = self.active_sheet.row_count
+        self.sheetsList = [x.title for x in self.data_source.worksheets]
+        logger.info(f'Open sheet: {self.sheetTitle}')
+
+    async def get_sheet_by_name(self, name):
+        self.active_sheet = self.data_source.worksheet(name)
+        self.sheetTitle = self.active_sheet.title
+        return self.sheetTitle
+
+    async def select_tab(self, tab_name):
+        await self.get_sheet_by_name(name=tab_name)
+        logger.info(f'Selected other sheet {self.active_sheet.title}')
+        return
+
+    async def update_sheets_list(self):
+        await self.data_source.fetch_metadata()
+        self.sheetsList = [x.title for x in self.data_source.worksheets]
+        return self.sheetsList
+
+    async def add_worksheet(self, title, rows=100, cols=255):
+        result = await self.data_source.add_worksheet(title=title, rows=rows, cols=cols)
+        if self.cache is not None:
+            self.cache.invalidate(self.sheetID, tab=title)
+        self.sheetsList = [x.title for x in self.data_source.worksheets]
+        return result
+
+    async def rename_sheet(self, newtitle):
+        old_title = self.active_sheet.title
+        await self.data_source.batch_update([{'updateSheetProperties': {
+                'properties': {'sheetId': self.active_sheet.id, 'title': newtitle}, 'fields': 'title'}}])
+        self.active_sheet.title = newtitle
+        self.sheetTitle = newtitle
+        self.sheetsList = [x.title for x in self.data_source.worksheets]
+        if self.cache is not None:
+            self.cache.rename_tab(self.sheetID, old_title, self.sheetTitle)
+        return self.sheetTitle
+
+    async def duplicate_sheet(self, title, new_title, insert_index=None):
+        """ duplicate sheet that titled by title """
+        if new_title in self.sheetsList:
+            await self.get_sheet_by_name(new_title)
+            return 'Duplicate'
+        if not insert_index:  # if not index specified add to the end
+            insert_index = len(self.sheetsList)
+        try:
+            await self.get_sheet_by_name(title)
+            await self.data_source.batch_update([{'duplicateSheet': {
+                    'sourceSheetId': self.active_sheet.id, 'insertSheetIndex': insert_index, 'newSheetName': new_title}}])
+            if self.cache is not None:
+                self.cache.invalidate(self.sheetID, tab=new_title)
+            await self.update_sheets_list()
+            await self.get_sheet_by_name(new_title)
+        except Exception as e:
+            return f'{e}'
+        return 'Success'
+
+    async def get_all_values(self):
+        """ Read values from sheet, a fresh list of row copies (the cache keeps its own) """
+        return [list(row) for row in await self._all_values()]
+
+    async def _all_values(self):
+        """ Rows of the tab as cached — shared, callers must not modify them """
+        if self.cache is not None:
+            cached = self.cache.get(self.sheetID, self.active_sheet.title)
+            if cached is not None:
+                return cached
+        try:
+            all_values = await self.data_source.retry_call(self.data_source.readAllValues, self.active_sheet)
+        except Exception as e:
+            logger.error(f"{e}")
+            raise
+        if self.cache is not None:
+            self.cache.put(self.sheetID, self.active_sheet.title, None, 'FORMATTED_VALUE', all_values)
+        return all_values
+
+    async def _read_range(self, rect):
+        """ Rows of the rectangle padded with '', from cache when it has the range or a range around it """
+        if self.cache is not None:
+            cached = self.cache.get(self.sheetID, self.active_sheet.title, rect)
+            if cached is not None:
+                return cached
+        rows = await self.data_source.readRangeValues(self.active_sheet, range_to_a1(rect))
+        width = rect[3] - rect[1] + 1
+        rows = [row + [''] * (width - len(row)) for row in rows]  # API trims empty cells at the row end
+        rows.extend([[''] * width for _ in range(rect[2] - rect[0] + 1 - len(rows))])  # ...and empty rows at the end
+        if self.cache is not None:
+            self.cache.put(self.sheetID, self.active_sheet.title, rect, 'FORMATTED_VALUE', rows)
+        return rows
+
+    async def read_sheet_to_dataframe(self, corner=None, width=None, heigh=None, range_a1=None):
+        """ Same arguments as GoogleSheet.read_sheet_to_dataframe """
+        try:
+            if corner and heigh:
+                row, col, *_ = parse_range(corner)
+                return pd.DataFrame(await self._read_range((row, col, row + heigh - 1, col + width - 1)))
+            elif range_a1:
+                return pd.DataFrame(await self._read_range(parse_range(range_a1)))
+            return pd.DataFrame(await self._all_values())
+        except Exception as e:
+            logger.error(f"{e}")
+            return pd.DataFrame()
+
+    async def read_sheet_to_list(self, corner=None, width=None, heigh=None, range=None):
+        return await self.get_all_values()
+
+    async def read_sheet_to_dict(self, corner=None, width=None, heigh=None, range=None):
+        dictionary = {}
+        list_of_lists = await self._all_values()  # the dict gets new column lists
+        try:
+            keys = list_of_lists[0]
+            values = list(map(list, itertools.zip_longest(*list_of_lists[1:], fillvalue=None)))  # Transpose rows to columns
+            for key, column in zip(keys, values):
+                dictionary[key] = column
+        except Exception as e:
+            logger.error(f"{e}")
+        return dictionary
+
+    async def update_range_by_corner(self, corner='A1', data=[['OPENED']]):
+        """ Updates data by corner A1 notation, list of lists, inner list is a row """
+        return await self.data_source.update_range_by_corner(self.active_sheet, corner=corner, data=data)
+
+    async def updateRangeColor(self, column1='B', line1=2, column2='B', line2=2, red=0.2, green=0.8, blue=0.2):
+        """ Function to change background color """
+        return await self.data_source.updateRangeColor(self.active_sheet,
+                                                       column1=column1, line1=line1,
+                                                       column2=column2, line2=line2,
+                                                       red=red, green=green, blue=blue)
@@ -0,0 +1,221 @@
+# import libraries
+import time
+import json
+import logging
+import threading
+from collections import deque
+from itertools import groupby
+
+from .ranges import (a1_to_rowcol, parse_range, range_to_a1, quote_title, grid_range,
+                     overlaps, bounding_box, merge_rectangles, touching_groups)
+
+logger = logging.getLogger(__name__)
+
+
+# #############################################################################
+# ####### ———————- WRITE-BEHIND BUFFER FOR SHEET UPDATES -——————— ############
+# #############################################################################
+class SheetBatch(object):
+    """ Write-behind buffer for one spreadsheet (used by GoogleSheetsObjects when batch mode is on)
+
+    Queues value writes, clears and format requests and sends them with the fewest calls:
+        one `values:batchClear`, one `values:batchUpdate` and one `spreadsheets:batchUpdate`.
+    Flushes by itself when `max_ops` / `max_bytes` are reached or `max_delay` seconds passed
+    since the first queued request.
+
+    How to call:
+    with GoogleSheetTable.batch():
+        GoogleSheetTable.update_range_by_corner('A1', [['a', 'b']])
+        GoogleSheetTable.updateRangeColor('A', 1, 'B', 1)
+    """
+
+    def __init__(self, data_source, max_ops=1000, max_bytes=4 * 1024 * 1024, max_delay=10.0,
+                 value_input_option='USER_ENTERED'):
+        self.data_source = data_source  # GoogleSheetsObjects with opened file
+        self.max_ops = max_ops
+        self.max_bytes = max_bytes
+        self.max_delay = max_delay
+        self.value_input_option = value_input_option
+        self.reports = deque(maxlen=100)  # last flush reports
+        self.totals = {'flushes': 0, 'requests': 0, 'bytes': 0, 'queued': 0}
+        self._lock = threading.RLock()
+        self._timer = None
+        self._reset()
+
+    def _reset(self):
+        self._values = []  # (sheet title, rect, rows)
+        self._clears = []  # (sheet title, rect)
+        self._formats = []  # (sheet id, rect, format)
+        self._bytes = 0
+
+    def __len__(self):
+        return len(self._values) + len(self._clears) + len(self._formats)
+
+    # ——————————————————————————— QUEUE ———————————————————————————
+    def queue_update(self, google_sheet_pointer, corner='A1', data=[[]]):
+        """ Queue values write, same as worksheet.update(corner, data) """
+        if not any(len(line) for line in data):
+            return None  # empty request
+        row, col = a1_to_rowcol(corner)
+        rows = [list(line) for line in data]
+        rect = (row, col, row + len(rows) - 1, col + max(len(line) for line in rows) - 1)
+        with self._lock:
+            self._values.append((google_sheet_pointer.title, rect, rows))
+            self._bytes += len(json.dumps(rows, default=str))
+            self._queued()
+        return None
+
+    def queue_clear(self, google_sheet_pointer, range_a1):
+        """ Queue values clear, pending writes under the range are dropped """
+        rect = parse_range(range_a1)
+        title = google_sheet_pointer.title
+        with self._lock:
+            for value_title, value_rect, rows in self._values:
+                if value_title == title and overlaps(rect, value_rect):
+                    self._mask(value_rect, rows, rect)
+            self._clears.append((title, rect))
+            self._bytes += len(range_a1) + len(title)
+            self._queued()
+        return None
+
+    def queue_format(self, google_sheet_pointer, range_a1, cell_format):
+        """ Queue format request, same as worksheet.format(range_a1, cell_format) """
+        with self._lock:
+            self._formats.append((google_sheet_pointer.id, parse_range(range_a1), cell_format))
+            self._bytes += len(json.dumps(cell_format)) + 100
+            self._queued()
+        return None
+
+    @staticmethod
+    def _mask(value_rect, rows, rect):
+        """ Cells cleared later must not be written (clears are sent first) """
+        for r in range(max(rect[0], value_rect[0]), min(rect[2], value_rect[2]) + 1):
+            line = rows[r - value_rect[0]]
+            for c in range(max(rect[1], value_rect[1]), min(rect[3], value_rect[3]) + 1):
+                if c - value_rect[1] < len(line):
+                    line[c - value_rect[1]] = None  # null is skipped by the API
+
+    def _queued(self):
+        self.totals['queued'] += 1
+        if len(self) >= self.max_ops or self._bytes >= self.max_bytes:
+            self.flush()
+        elif self._timer is None and self.max_delay:
+            self._timer = threading.Timer(self.max_delay, self._timed_flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _timed_flush(self):
+        try:
+            self.flush()
+        except Exception as e:
+            logger.error(f"Batch flush failed, {len(self)} requests stay queued: {e}")
+
+    def discard(self):
+        """ Drops everything queued, returns how many requests were dropped """
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            dropped = len(self)
+            self._reset()
+        return dropped
+
+    # ——————————————————————————— FLUSH ———————————————————————————
+    def flush(self):
+        """ Sends everything queued, returns report with calls and bytes sent
+
+            If a call fails, the requests not sent yet stay queued (the next flush sends them) and the error is raised.
+        """
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            report = {'requests': 0, 'bytes': 0, 'values': 0, 'clears': 0, 'formats': 0, 'seconds': 0.0}
+            if not len(self):
+                return report
+            started = time.monotonic()
+            values, clears, formats = self._values, self._clears, self._formats
+            wks = self.data_source.wks
+            if clears:  # clears go first, later writes were queued on top of them
+                ranges = [f"{quote_title(title)}!{range_to_a1(rect)}" for title, rect in self._merge_clears(clears)]
+                self._send(self.data_source, wks.values_batch_clear, report, body={'ranges': ranges})
+                self._clears = []  # a group leaves the queue only once sent, a failed call keeps the rest queued
+                report['clears'] = len(ranges)
+                if self.data_source.cache is not None:
+                    for title, rect in clears:
+                        self.data_source.cache.patch_clear(self.data_source.file_id, title, rect)
+            if values:
+                blocks = self._merge_values(values)
+                data = [{'range': f"{quote_title(title)}!{range_to_a1(rect)}", 'values': rows}
+                        for title, rect, rows in blocks]
+                self._send(self.data_source, wks.values_batch_update, report,
+                           body={'valueInputOption': self.value_input_option, 'data': data})
+                self._values = []
+                report['values'] = len(data)
+                if self.data_source.cache is not None:
+                    for title, rect, _ in blocks:
+                        self.data_source.cache.invalidate(self.data_source.file_id, title, rect)
+            if formats:
+                requests = [{'repeatCell': {
+                                'range': grid_range(sheet_id, rect),
+                                'cell': {'userEnteredFormat': cell_format},
+                                'fields': 'userEnteredFormat({})'.format(','.join(cell_format.keys()))}}
+                            for sheet_id, rect, cell_format in self._merge_formats(formats)]
+                self._send(self.data_source, wks.batch_update, report, body={'requests': requests})
+                self._formats = []
+                report['formats'] = len(requests)
+            self._reset()
+            report['seconds'] = round(time.monotonic() - started, 3)
+            self.reports.append(report)
+            self.totals['flushes'] += 1
+            self.totals['requests'] += report['requests']
+            self.totals['bytes'] += report['bytes']
+            logger.info(f"Batch flushed: {report}")
+            return report
+
+    @staticmethod
+    def _send(data_source, method, report, body):
+        report['bytes'] += len(json.dumps(body, default=str).encode('utf-8'))
+        report['requests'] += 1
+        return data_source.api_call(method, body=body)
+
+    @staticmethod
+    def _merge_clears(clears):
+        by_title = {}
+        for title, rect in clears:
+            by_title.setdefault(title, []).append(rect)
+        return [(title, rect) for title, rects in by_title.items() for rect in merge_rectangles(rects)]
+
+    @staticmethod
+    def _merge_values(values):
+        """ Touching / overlapping writes become one block, later writes win, gaps are nulls """
+        by_title = {}
+        for title, rect, rows in values:
+            by_title.setdefault(title, []).append((rect, rows))
+        merged = []
+        for title, blocks in by_title.items():
+            for group in touching_groups([rect for rect, _ in blocks]):
+                if len(group) == 1:
+                    merged.append((title,) + blocks[group[0]])
+                    continue
+                box = bounding_box(blocks[i][0] for i in group)
+                grid = [[None] * (box[3] - box[1] + 1) for _ in range(box[2] - box[0] + 1)]
+                for i in group:  # indexes are in queue order
+                    rect, rows = blocks[i]
+                    for r, line in enumerate(rows, start=rect[0] - box[0]):
+                        for c, value in enumerate(line, start=rect[1] - box[1]):
+                            if value is not None:
+                                grid[r][c] = value
+                merged.append((title, box, grid))
+        return merged
+
+    @staticmethod
+    def _merge_formats(formats):
+        """ Merges rectangles inside runs of the same format, so the order of overrides is kept """
+        merged = []
+        runs = groupby(formats, key=lambda item: (item[0], json.dumps(item[2], sort_keys=True)))
+        for _, run in runs:
+            run = list(run)
+            sheet_id, _, cell_format = run[0]
+            merged.extend((sheet_id, rect, cell_format) for rect in merge_rectangles([item[1] for item in run]))
+        return merged
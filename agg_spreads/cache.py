@@ -0,0 +1,155 @@
+# import libraries
+import time
+import logging
+import threading
+from collections import OrderedDict
+
+from .ranges import overlaps
+
+logger = logging.getLogger(__name__)
+
+FULL_TAB = None  # rect of a whole-tab read (get_all_values)
+
+
+# #############################################################################
+# ####### ———————- READ-THROUGH CACHE FOR SHEET RANGES -——————— ##############
+# #############################################################################
+class RangeCache(object):
+    """ In-memory cache of read ranges, opt-in (pass it to GoogleSheet)
+
+    Entries are keyed by (spreadsheet id, tab title, rect, render option), rect is (row1, col1, row2, col2)
+    or FULL_TAB for whole-tab reads. A read of a sub-range is answered from any cached range around it.
+    Entries live `ttl` seconds, least recently used ones are evicted above `max_bytes`.
+
+    How to call:
+    cache = RangeCache(ttl=60, max_bytes=64 * 1024 * 1024)  # may be shared by several GoogleSheet objects
+    GoogleSheetTable = GoogleSheet(keyfile='<API key file.json>', sheetID='<ID>', cache=cache)
+    print(cache.stats())
+    """
+
+    def __init__(self, ttl=60.0, max_bytes=64 * 1024 * 1024):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (rows, size, expires at), least recently used first
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self.counters = {'hits': 0, 'partial_hits': 0, 'misses': 0, 'evictions': 0,
+                         'expirations': 0, 'invalidations': 0, 'patches': 0}
+
+    @staticmethod
+    def _size(rows):
+        """ Rough memory estimate: list overheads plus ~50 bytes per cell and its text """
+        return 64 + sum(64 + 8 * len(row) + sum(50 + len(str(value)) for value in row) for row in rows)
+
+    # ——————————————————————————— READ ———————————————————————————
+    def get(self, spreadsheet_id, tab, rect=FULL_TAB, render='FORMATTED_VALUE'):
+        """ Cached rows for the rect (padded with '' like a range read) or None """
+        with self._lock:
+            key = (spreadsheet_id, tab, rect, render)
+            rows = self._alive(key)
+            if rows is not None:
+                self.counters['hits'] += 1
+                return rows
+            if rect is not FULL_TAB:  # look for a cached range around it
+                for other in list(self._entries):
+                    if other[:2] != key[:2] or other[3] != render:
+                        continue
+                    outer = other[2]
+                    if outer is FULL_TAB or (outer[0] <= rect[0] and outer[1] <= rect[1]
+                                             and outer[2] >= rect[2] and outer[3] >= rect[3]):
+                        rows = self._alive(other)
+                        if rows is not None:
+                            self.counters['partial_hits'] += 1
+                            return self._slice(rows, outer or (1, 1), rect)
+            self.counters['misses'] += 1
+            return None
+
+    def _alive(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[2] < time.monotonic():
+            self._drop(key)
+            self.counters['expirations'] += 1
+            return None
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    @staticmethod
+    def _slice(rows, outer, rect):
+        top, left = rect[0] - outer[0], rect[1] - outer[1]
+        width = rect[3] - rect[1] + 1
+        result = []
+        for r in range(top, top + rect[2] - rect[0] + 1):
+            row = rows[r][left:left + width] if r < len(rows) else []
+            result.append(list(row) + [''] * (width - len(row)))
+        return result
+
+    # ——————————————————————————— WRITE ———————————————————————————
+    def put(self, spreadsheet_id, tab, rect, render, rows):
+        """ Stores a read, returns rows back """
+        size = self._size(rows)
+        if size > self.max_bytes:
+            return rows  # would evict everything and still not fit
+        with self._lock:
+            key = (spreadsheet_id, tab, rect, render)
+            self._drop(key)
+            self._entries[key] = (rows, size, time.monotonic() + self.ttl)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self.counters['evictions'] += 1
+        return rows
+
+    def _drop(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+
+    def _affected(self, spreadsheet_id, tab, rect):
+        for key in list(self._entries):
+            if key[0] != spreadsheet_id or (tab is not None and key[1] != tab):
+                continue
+            if rect is None or key[2] is FULL_TAB or overlaps(key[2], rect):
+                yield key
+
+    def invalidate(self, spreadsheet_id, tab=None, rect=None):
+        """ Drops entries of the file / tab / touched by the rect """
+        with self._lock:
+            for key in self._affected(spreadsheet_id, tab, rect):
+                self._drop(key)
+                self.counters['invalidations'] += 1
+
+    def patch_clear(self, spreadsheet_id, tab, rect):
+        """ Values of a cleared range are known (''), so entries are patched instead of dropped """
+        with self._lock:
+            for key in self._affected(spreadsheet_id, tab, rect):
+                rows, size, expires = self._entries[key]
+                outer = key[2] or (1, 1, len(rows), max((len(row) for row in rows), default=0))
+                rows = [list(row) for row in rows]
+                for r in range(max(rect[0], outer[0]), min(rect[2], outer[2]) + 1):
+                    row = rows[r - outer[0]] if r - outer[0] < len(rows) else []
+                    for c in range(max(rect[1], outer[1]), min(rect[3], outer[3]) + 1):
+                        if c - outer[1] < len(row):
+                            row[c - outer[1]] = ''
+                self._entries[key] = (rows, size, expires)
+                self.counters['patches'] += 1
+
+    def rename_tab(self, spreadsheet_id, old_title, new_title):
+        """ Moves entries of a renamed tab to its new title """
+        with self._lock:
+            self.invalidate(spreadsheet_id, tab=new_title)
+            for key in self._affected(spreadsheet_id, old_title, None):
+                self._entries[(key[0], new_title) + key[2:]] = self._entries.pop(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """ Counters to size the cache with """
+        with self._lock:
+            result = dict(self.counters)
+            result.update({'entries': len(self._entries), 'bytes': self._bytes, 'max_bytes': self.max_bytes})
+            return result
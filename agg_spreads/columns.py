@@ -0,0 +1,118 @@
+# import libraries
+import logging
+
+from .lazy import LazyModule
+from .ranges import index_to_column
+
+np = LazyModule('numpy')
+
+logger = logging.getLogger(__name__)
+
+SERIAL_EPOCH = '1899-12-30'  # day 0 of Sheets date serial numbers
+DATE_DTYPES = {'datetime': 'datetime64[ms]', 'date': 'datetime64[D]'}
+
+
+# #############################################################################
+# ####### ———————- TYPED COLUMNS FROM UNFORMATTED VALUES -——————— ############
+# #############################################################################
+# values.get with majorDimension=COLUMNS, UNFORMATTED_VALUE and SERIAL_NUMBER gives every column
+# as one JSON list of numbers / bools / strings, each list goes to NumPy in one call.
+
+
+def serial_to_datetime(serials, unit='ms'):
+    """ Float array of date serials (days since 1899-12-30) -> datetime64[unit], NaN -> NaT """
+    serials = np.asarray(serials, dtype=np.float64)
+    per_day = np.timedelta64(1, 'D') / np.timedelta64(1, unit)
+    missing = np.isnan(serials)
+    offsets = np.round(np.where(missing, 0, serials) * per_day).astype(np.int64).astype(f'timedelta64[{unit}]')
+    result = np.datetime64(SERIAL_EPOCH, unit) + offsets
+    result[missing] = np.datetime64('NaT')
+    return result
+
+
+def to_array(values, dtype=None):
+    """ One column of unformatted values -> NumPy array
+
+        dtype None infers: bool, int64 (float64 with empty cells), float64, or object of str (None when empty).
+        'datetime' / 'date' convert date serials, 'str' keeps text, any NumPy dtype is cast to.
+    """
+    raw = np.array(values, dtype=object)
+    missing = np.equal(raw, '') | np.equal(raw, None)
+    if dtype in DATE_DTYPES or (dtype is not None and np.dtype(dtype).kind == 'M'):
+        unit = np.datetime_data(np.dtype(DATE_DTYPES.get(dtype, dtype)))[0]
+        return serial_to_datetime(_numbers(raw, missing), unit)
+    if dtype is None:
+        probe = np.array(raw[~missing].tolist())  # NumPy picks bool / int / float / str for the present cells
+        kind = probe.dtype.kind if probe.size else 'f'
+        if kind == 'b':
+            return probe if not missing.any() else _with_missing(raw, missing)
+        if kind in 'iu' and not missing.any():
+            return probe.astype(np.int64)
+        if kind in 'iuf':
+            return _numbers(raw, missing)
+        return _strings(raw, missing)
+    if dtype in (str, 'str', object, 'object'):
+        return _strings(raw, missing)
+    dtype = np.dtype(dtype)
+    if dtype.kind == 'b':
+        raw[missing] = False
+        return raw.astype(bool)
+    numbers = _numbers(raw, missing)
+    if dtype.kind in 'iu' and missing.any():
+        return numbers  # NumPy ints have no NaN — empty cells keep the column float64
+    return numbers.astype(dtype)
+
+
+def _numbers(raw, missing):
+    filled = raw.copy()
+    filled[missing] = np.nan
+    return filled.astype(np.float64)
+
+
+def _strings(raw, missing):
+    result = raw.astype(str).astype(object)
+    result[missing] = None
+    return result
+
+
+def _with_missing(raw, missing):
+    result = raw.copy()
+    result[missing] = None
+    return result
+
+
+def column_names(headers, first_col=1):
+    """ Header cells -> unique names, an empty header becomes the column letter, repeats get .1, .2 """
+    names, seen = [], {}
+    for offset, header in enumerate(headers):
+        name = str(header) if header not in (None, '') else index_to_column(first_col + offset)
+        if name in seen:
+            seen[name] += 1
+            name = f'{name}.{seen[name]}'
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+
+def build_columns(columns, header_row=1, dtypes=None, first_col=1, backend='numpy'):
+    """ COLUMNS-major payload -> {name: array}
+
+        header_row — row of the names within the range (1-based), None — no header (names are column letters);
+        dtypes — one dtype for every column or {name: dtype}; backend — 'numpy' or 'arrow' (pyarrow arrays).
+    """
+    skip = header_row or 0
+    height = max(0, max((len(column) for column in columns), default=0) - skip)
+    headers = [column[header_row - 1] if header_row and len(column) >= header_row else '' for column in columns]
+    result = {}
+    for name, column in zip(column_names(headers, first_col), columns):
+        body = column[skip:]
+        body = body + [''] * (height - len(body))  # the API trims empty cells at the column end
+        dtype = dtypes.get(name) if isinstance(dtypes, dict) else dtypes
+        result[name] = to_array(body, dtype)
+    if backend == 'arrow':
+        import pyarrow  # optional: pip3 install pyarrow
+        result = {name: pyarrow.array(array, from_pandas=True) for name, array in result.items()}
+    elif backend != 'numpy':
+        raise ValueError(f"Unknown backend {backend!r}, use 'numpy' or 'arrow'")
+    return result
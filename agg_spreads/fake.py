@@ -0,0 +1,688 @@
+# import libraries
+import re
+import json
+import time
+import math
+import random
+import logging
+import datetime
+import threading
+from collections import deque
+from urllib.parse import urlsplit, parse_qs, unquote
+
+from requests.adapters import BaseAdapter
+
+from .pool import ClientPool
+from .ranges import column_to_index, index_to_column, split_title, quote_title
+
+logger = logging.getLogger(__name__)
+
+SIDE_RE = re.compile(r'^\$?([A-Za-z]*)\$?(\d*)$')
+
+
+# #############################################################################
+# ####### ———————- IN-PROCESS FAKE SHEETS v4 / DRIVE v2 -——————— #############
+# #############################################################################
+class FakeAPIError(Exception):
+    def __init__(self, status, message, reason=None):
+        self.status = status
+        self.message = message
+        self.reason = reason
+        super().__init__(f"{status}: {message}")
+
+
+class FakeGoogle(object):
+    """ Local stand-in for the Sheets v4 and Drive v2 endpoints used by GoogleSheetsObjects
+
+    Spreadsheets live in memory. Requests get optional latency, a per-minute quota (429 with Retry-After)
+    and injected 5xx / 429 errors. Every call is counted with its bytes in and out.
+
+    How to call:
+    fake = FakeGoogle(latency=0.05, quota_per_minute=300, error_rate=0.01)
+    sheet_id = fake.create_spreadsheet('Report', tabs=['Data'])
+    fake.set_values(sheet_id, 'Data', [['a', 'b'], [1, 2]])
+    GoogleSheetTable = GoogleSheet(keyfile='fake.json', sheetID=sheet_id, pool=fake.pool())
+    base_url = fake.serve()  # real HTTP on localhost, e.g. for AsyncSheetsSession(None, sheets_url=base_url + '/v4/spreadsheets')
+    print(fake.stats())
+    """
+
+    def __init__(self, latency=0.0, jitter=0.0, quota_per_minute=None, quota_period=60.0,
+                 error_rate=0.0, error_statuses=(500, 503), seed=None):
+        self.latency = latency  # seconds added to every request
+        self.jitter = jitter  # ± seconds of random latency
+        self.quota_per_minute = quota_per_minute  # requests per quota_period, None — unlimited
+        self.quota_period = quota_period
+        self.error_rate = error_rate  # share of requests failing with one of error_statuses
+        self.error_statuses = error_statuses
+        self.random = random.Random(seed)
+        self.files = {}  # file id -> spreadsheet dict
+        self._lock = threading.RLock()
+        self._recent = deque()  # request times inside the quota window
+        self._failures = deque()  # (status, retry_after) to answer the next requests with
+        self._next_id = 0
+        self._server = None
+        self.reset_stats()
+
+    # ——————————————————————————— SEEDING ———————————————————————————
+    def _new_id(self, prefix):
+        with self._lock:
+            self._next_id += 1
+            return f'{prefix}{self._next_id:08d}'
+
+    def create_spreadsheet(self, title='Untitled', tabs=('Sheet1',), rows=1000, cols=26, parents=None):
+        """ New spreadsheet with empty tabs, returns its id """
+        file_id = self._new_id('fake-')
+        with self._lock:
+            self.files[file_id] = {
+                'id': file_id, 'title': title, 'parents': list(parents or []), 'version': 1,
+                'modified': _now(), 'sheets': [], 'formats': [], 'next_sheet_id': 0,
+                'permissions': [{'id': 'owner', 'role': 'owner', 'type': 'user',
+                                 'emailAddress': 'service-account@fake.iam.gserviceaccount.com'}]}
+            for title_ in tabs:
+                self._add_sheet(self.files[file_id], {'title': title_,
+                                                      'gridProperties': {'rowCount': rows, 'columnCount': cols}})
+        return file_id
+
+    def set_values(self, file_id, tab, rows, corner='A1'):
+        """ Puts values straight into a tab (no request counted), grows the grid if needed """
+        with self._lock:
+            sheet = self._sheet(self.files[file_id], tab)
+            row, col = _cell(corner)
+            grid = sheet['properties']['gridProperties']
+            grid['rowCount'] = max(grid['rowCount'], row + len(rows) - 1)
+            grid['columnCount'] = max(grid['columnCount'], col - 1 + max((len(line) for line in rows), default=0))
+            self._write(sheet, row, col, rows, 'RAW')
+            self._touch(self.files[file_id])
+
+    def get_values(self, file_id, tab):
+        """ Stored values of a tab (rows trimmed like the API does) """
+        with self._lock:
+            sheet = self._sheet(self.files[file_id], tab)
+            return _trim([list(line) for line in sheet['cells']])
+
+    def fail_next(self, status=503, count=1, retry_after=None):
+        """ The next `count` requests get `status` (429 gets Retry-After if given) """
+        with self._lock:
+            self._failures.extend([(status, retry_after)] * count)
+
+    # ——————————————————————————— STATS ———————————————————————————
+    def reset_stats(self):
+        with self._lock:
+            self.counters = {'requests': 0, 'bytes_in': 0, 'bytes_out': 0, 'errors': 0,
+                             'throttled': 0, 'by_endpoint': {}}
+
+    def stats(self):
+        with self._lock:
+            result = dict(self.counters)
+            result['by_endpoint'] = dict(self.counters['by_endpoint'])
+            return result
+
+    # ——————————————————————————— TRANSPORTS ———————————————————————————
+    def pool(self):
+        """ ClientPool whose gspread clients and Drive services talk to this fake """
+        return FakeClientPool(self)
+
+    def serve(self, host='127.0.0.1', port=0):
+        """ Serves the fake over HTTP in a daemon thread, returns the base URL """
+        from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+        backend = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _handle(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                body = self.rfile.read(length) if length else None
+                status, headers, content = backend.handle(self.command, self.path, body)
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _handle
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return f'http://{host}:{self._server.server_address[1]}'
+
+    def shutdown(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    # ——————————————————————————— DISPATCH ———————————————————————————
+    def handle(self, method, url, body=None):
+        """ One HTTP request -> (status, headers, content bytes) """
+        if self.latency or self.jitter:
+            time.sleep(max(0.0, self.latency + self.random.uniform(-self.jitter, self.jitter)))
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        if urlsplit(url).path.startswith('/batch/'):
+            return self._batch(body or b'')
+        return self._respond(method, url, body)
+
+    def _respond(self, method, url, body):
+        parts = urlsplit(url)
+        params = parse_qs(parts.query, keep_blank_values=True)
+        method = method.upper()
+        try:
+            with self._lock:
+                endpoint = self._endpoint(method, parts.path)
+                self.counters['requests'] += 1
+                self.counters['bytes_in'] += len(body or b'') + len(url)
+                self.counters['by_endpoint'][endpoint] = self.counters['by_endpoint'].get(endpoint, 0) + 1
+                self._admit()
+                payload = json.loads(body) if body else {}
+                result = self._route(method, parts.path, params, payload)
+            status, headers, content = 200, {'Content-Type': 'application/json; charset=UTF-8'}, \
+                json.dumps(result).encode('utf-8')
+        except FakeAPIError as e:
+            status, headers, content = self._error(e)
+        with self._lock:
+            self.counters['bytes_out'] += len(content)
+        return status, headers, content
+
+    def _batch(self, body):
+        """ multipart/mixed batch (googleapiclient new_batch_http_request), every part is a request of its own """
+        with self._lock:
+            self.counters['by_endpoint']['batch'] = self.counters['by_endpoint'].get('batch', 0) + 1
+        body = body.replace(b'\r\n', b'\n')
+        boundary = body.split(b'\n', 1)[0].strip()  # the first line is --boundary
+        answers = []
+        for part in body.split(boundary)[1:]:
+            if part.startswith(b'--'):
+                break  # closing boundary
+            part_headers, _, request = part.strip(b'\n').partition(b'\n\n')
+            content_id = next((line.split(b':', 1)[1].strip().decode() for line in part_headers.splitlines()
+                               if line.lower().startswith(b'content-id')), '<0>')
+            head, _, request_body = request.partition(b'\n\n')
+            method, path, _ = head.splitlines()[0].decode().split(' ', 2)
+            status, headers, content = self._respond(method, path, request_body.strip() or None)
+            answers.append(f'--batch_fake\r\nContent-Type: application/http\r\n'
+                           f'Content-ID: <response-{content_id.strip("<>")}>\r\n\r\n'
+                           f'HTTP/1.1 {status} {"OK" if status < 400 else "Error"}\r\n'
+                           f'Content-Type: application/json; charset=UTF-8\r\nContent-Length: {len(content)}\r\n\r\n'
+                           .encode() + content + b'\r\n')
+        content = b''.join(answers) + b'--batch_fake--\r\n'
+        return 200, {'Content-Type': 'multipart/mixed; boundary=batch_fake'}, content
+
+    def _admit(self):
+        """ Injected errors and the quota window, raises FakeAPIError """
+        if self._failures:
+            status, retry_after = self._failures.popleft()
+            self.counters['errors'] += 1
+            raise FakeAPIError(status, 'Injected error', retry_after)
+        if self.error_rate and self.random.random() < self.error_rate:
+            self.counters['errors'] += 1
+            raise FakeAPIError(self.random.choice(self.error_statuses), 'Injected error')
+        if self.quota_per_minute:
+            now = time.monotonic()
+            while self._recent and self._recent[0] <= now - self.quota_period:
+                self._recent.popleft()
+            if len(self._recent) >= self.quota_per_minute:
+                self.counters['throttled'] += 1
+                raise FakeAPIError(429, 'Quota exceeded for quota metric "Read requests" (fake)',
+                                   math.ceil(self._recent[0] + self.quota_period - now))
+            self._recent.append(now)
+
+    @staticmethod
+    def _error(e):
+        headers = {'Content-Type': 'application/json; charset=UTF-8'}
+        if e.status == 429 and e.reason is not None:
+            headers['Retry-After'] = str(e.reason)
+        status_name = {400: 'INVALID_ARGUMENT', 403: 'PERMISSION_DENIED', 404: 'NOT_FOUND',
+                       429: 'RESOURCE_EXHAUSTED', 500: 'INTERNAL', 503: 'UNAVAILABLE'}.get(e.status, 'UNKNOWN')
+        reason = 'rateLimitExceeded' if e.status == 429 else status_name.lower()
+        error = {'error': {'code': e.status, 'message': e.message, 'status': status_name,
+                           'errors': [{'reason': reason, 'message': e.message, 'domain': 'global'}]}}
+        return e.status, headers, json.dumps(error).encode('utf-8')
+
+    @staticmethod
+    def _endpoint(method, path):
+        """ Short name of the endpoint for stats """
+        if path.startswith('/batch/'):
+            return 'batch'
+        if '/drive/v2/' in path:
+            tail = path.split('/drive/v2/', 1)[1].split('/')
+            if len(tail) >= 3 and tail[2] == 'permissions':
+                return f'drive.permissions.{method.lower()}'
+            if len(tail) >= 3:
+                return f'drive.files.{tail[2]}'
+            return 'drive.files.insert' if method == 'POST' else f'drive.files.{method.lower()}'
+        tail = path.split('/v4/spreadsheets/', 1)[-1]
+        if '/values' not in tail:
+            return 'spreadsheets.batchUpdate' if tail.endswith(':batchUpdate') else 'spreadsheets.get'
+        values = tail.split('/values', 1)[1]
+        if values.startswith(':'):
+            return 'values.' + values[1:]
+        for suffix in (':clear', ':append'):
+            if values.endswith(suffix):
+                return 'values.' + suffix[1:]
+        return 'values.get' if method == 'GET' else 'values.update'
+
+    def _route(self, method, path, params, body):
+        if '/drive/v2/' in path:
+            return self._drive(method, path.split('/drive/v2/', 1)[1], params, body)
+        if '/v4/spreadsheets/' not in path:
+            raise FakeAPIError(404, f'Unknown path {path}')
+        tail = path.split('/v4/spreadsheets/', 1)[1]
+        if '/values' not in tail:
+            if tail.endswith(':batchUpdate'):
+                return self._batch_update(self._file(tail[:-len(':batchUpdate')]), body)
+            return self._metadata(self._file(tail))
+        file_id, values = tail.split('/values', 1)
+        spreadsheet = self._file(file_id)
+        render = _param(params, 'valueRenderOption', 'FORMATTED_VALUE')
+        dimension = _param(params, 'majorDimension', 'ROWS')
+        if values == ':batchGet':
+            return {'spreadsheetId': file_id,
+                    'valueRanges': [self._values_get(spreadsheet, name, render, dimension)
+                                    for name in params.get('ranges', [])]}
+        if values == ':batchUpdate':
+            option = body.get('valueInputOption', 'RAW')
+            responses = [self._values_update(spreadsheet, item['range'], item.get('values', []), option)
+                         for item in body.get('data', [])]
+            return {'spreadsheetId': file_id, 'responses': responses,
+                    'totalUpdatedCells': sum(item['updatedCells'] for item in responses)}
+        if values == ':batchClear':
+            return {'spreadsheetId': file_id,
+                    'clearedRanges': [self._values_clear(spreadsheet, name) for name in body.get('ranges', [])]}
+        name = unquote(values[1:])
+        if name.endswith(':clear'):
+            return {'spreadsheetId': file_id, 'clearedRange': self._values_clear(spreadsheet, name[:-len(':clear')])}
+        if name.endswith(':append'):
+            return self._values_append(spreadsheet, name[:-len(':append')], body.get('values', []),
+                                       _param(params, 'valueInputOption', 'RAW'))
+        if method == 'GET':
+            return self._values_get(spreadsheet, name, render, dimension)
+        return self._values_update(spreadsheet, name, body.get('values', []),
+                                   _param(params, 'valueInputOption', 'RAW'), dimension=body.get('majorDimension', 'ROWS'))
+
+    # ——————————————————————————— SHEETS ———————————————————————————
+    def _file(self, file_id):
+        spreadsheet = self.files.get(unquote(file_id))
+        if spreadsheet is None:
+            raise FakeAPIError(404, f'Requested entity was not found: {file_id}')
+        return spreadsheet
+
+    @staticmethod
+    def _touch(spreadsheet):
+        spreadsheet['version'] += 1
+        spreadsheet['modified'] = _now()
+
+    def _metadata(self, spreadsheet):
+        return {'spreadsheetId': spreadsheet['id'],
+                'properties': {'title': spreadsheet['title'], 'locale': 'en_US', 'timeZone': 'Etc/GMT'},
+                'sheets': [{'properties': json.loads(json.dumps(sheet['properties']))}
+                           for sheet in spreadsheet['sheets']]}
+
+    def _add_sheet(self, spreadsheet, properties, index=None, cells=None):
+        grid = properties.get('gridProperties', {})
+        sheet_id = properties.get('sheetId')
+        if sheet_id is None:
+            sheet_id = spreadsheet['next_sheet_id']
+        spreadsheet['next_sheet_id'] = max(spreadsheet['next_sheet_id'], sheet_id) + 1
+        title = properties.get('title') or f"Sheet{len(spreadsheet['sheets']) + 1}"
+        if any(sheet['properties']['title'] == title for sheet in spreadsheet['sheets']):
+            raise FakeAPIError(400, f'A sheet with the name "{title}" already exists.')
+        index = len(spreadsheet['sheets']) if index is None else min(int(index), len(spreadsheet['sheets']))
+        sheet = {'properties': {'sheetId': sheet_id, 'title': title, 'index': index, 'sheetType': 'GRID',
+                                'gridProperties': {'rowCount': int(grid.get('rowCount', 1000)),
+                                                   'columnCount': int(grid.get('columnCount', 26))}},
+                 'cells': cells if cells is not None else []}
+        spreadsheet['sheets'].insert(index, sheet)
+        for position, other in enumerate(spreadsheet['sheets']):
+            other['properties']['index'] = position
+        return sheet
+
+    def _sheet(self, spreadsheet, title=None, sheet_id=None):
+        for sheet in spreadsheet['sheets']:
+            if (sheet_id is not None and sheet['properties']['sheetId'] == sheet_id) or \
+                    (sheet_id is None and sheet['properties']['title'] == title):
+                return sheet
+        raise FakeAPIError(400, f'Unable to parse range: {title if sheet_id is None else sheet_id}')
+
+    def _resolve(self, spreadsheet, name):
+        """ 'Tab'!A1:B2 / Tab / A1:B2 -> (sheet, (row1, col1, row2, col2)) clipped to the grid """
+        title, cells = split_title(name)
+        if title is None:
+            titles = [sheet['properties']['title'] for sheet in spreadsheet['sheets']]
+            plain = name[1:-1].replace("''", "'") if name.startswith("'") and name.endswith("'") else name
+            if plain in titles:
+                title, cells = plain, ''
+            else:
+                title = titles[0]
+        sheet = self._sheet(spreadsheet, title)
+        grid = sheet['properties']['gridProperties']
+        return sheet, _bounds(cells, grid['rowCount'], grid['columnCount'], name)
+
+    def _a1(self, sheet, rect):
+        return f"{quote_title(sheet['properties']['title'])}!{index_to_column(rect[1])}{rect[0]}:" \
+               f"{index_to_column(rect[3])}{rect[2]}"
+
+    def _values_get(self, spreadsheet, name, render, dimension):
+        sheet, rect = self._resolve(spreadsheet, name)
+        rows = []
+        for r in range(rect[0] - 1, min(rect[2], len(sheet['cells']))):
+            line = sheet['cells'][r][rect[1] - 1:rect[3]]
+            rows.append([_render(value, render) for value in line])
+        rows = _trim(rows)
+        if dimension == 'COLUMNS' and rows:
+            width = max(len(line) for line in rows)
+            rows = _trim([list(column) for column in zip(*[line + [''] * (width - len(line)) for line in rows])])
+        result = {'range': self._a1(sheet, rect), 'majorDimension': dimension}
+        if rows:
+            result['values'] = rows
+        return result
+
+    def _write(self, sheet, row, col, rows, option):
+        cells = sheet['cells']
+        for r, line in enumerate(rows, start=row - 1):
+            while len(cells) <= r:
+                cells.append([])
+            target = cells[r]
+            if len(target) < col - 1 + len(line):
+                target.extend([None] * (col - 1 + len(line) - len(target)))
+            for c, value in enumerate(line, start=col - 1):
+                if value is None:
+                    continue  # null leaves the cell as it is
+                target[c] = _parse(value) if option == 'USER_ENTERED' else value
+
+    def _values_update(self, spreadsheet, name, rows, option, dimension='ROWS'):
+        sheet, rect = self._resolve(spreadsheet, name)
+        if dimension == 'COLUMNS':
+            width = max((len(line) for line in rows), default=0)
+            rows = [list(line) for line in zip(*[line + [None] * (width - len(line)) for line in rows])]
+        height, width = len(rows), max((len(line) for line in rows), default=0)
+        grid = sheet['properties']['gridProperties']
+        if rect[0] + height - 1 > grid['rowCount'] or rect[1] + width - 1 > grid['columnCount']:
+            raise FakeAPIError(400, f"Range ({name}) exceeds grid limits. Max rows: {grid['rowCount']}, "
+                                    f"max columns: {grid['columnCount']}")
+        self._write(sheet, rect[0], rect[1], rows, option)
+        self._touch(spreadsheet)
+        updated = (rect[0], rect[1], rect[0] + max(height, 1) - 1, rect[1] + max(width, 1) - 1)
+        return {'spreadsheetId': spreadsheet['id'], 'updatedRange': self._a1(sheet, updated),
+                'updatedRows': height, 'updatedColumns': width,
+                'updatedCells': sum(len(line) for line in rows)}
+
+    def _values_clear(self, spreadsheet, name):
+        sheet, rect = self._resolve(spreadsheet, name)
+        for r in range(rect[0] - 1, min(rect[2], len(sheet['cells']))):
+            line = sheet['cells'][r]
+            for c in range(rect[1] - 1, min(rect[3], len(line))):
+                line[c] = None
+        self._touch(spreadsheet)
+        return self._a1(sheet, rect)
+
+    def _values_append(self, spreadsheet, name, rows, option):
+        sheet, rect = self._resolve(spreadsheet, name)
+        last = 0  # last row with data below the range start
+        for r in range(len(sheet['cells']) - 1, rect[0] - 2, -1):
+            line = sheet['cells'][r][rect[1] - 1:]
+            if any(value not in (None, '') for value in line):
+                last = r + 1
+                break
+        start = max(last + 1, rect[0])
+        grid = sheet['properties']['gridProperties']
+        grid['rowCount'] = max(grid['rowCount'], start + len(rows) - 1)
+        grid['columnCount'] = max(grid['columnCount'], rect[1] - 1 + max((len(line) for line in rows), default=0))
+        self._write(sheet, start, rect[1], rows, option)
+        self._touch(spreadsheet)
+        width = max((len(line) for line in rows), default=1)
+        updated = (start, rect[1], start + max(len(rows), 1) - 1, rect[1] + width - 1)
+        return {'spreadsheetId': spreadsheet['id'], 'tableRange': self._a1(sheet, rect),
+                'updates': {'spreadsheetId': spreadsheet['id'], 'updatedRange': self._a1(sheet, updated),
+                            'updatedRows': len(rows), 'updatedColumns': width,
+                            'updatedCells': sum(len(line) for line in rows)}}
+
+    def _batch_update(self, spreadsheet, body):
+        replies = []
+        for request in body.get('requests', []):
+            kind, spec = next(iter(request.items()))
+            replies.append(self._apply(spreadsheet, kind, spec))
+        self._touch(spreadsheet)
+        return {'spreadsheetId': spreadsheet['id'], 'replies': replies}
+
+    def _apply(self, spreadsheet, kind, spec):
+        if kind == 'addSheet':
+            properties = spec.get('properties', {})
+            sheet = self._add_sheet(spreadsheet, properties, index=properties.get('index'))
+            return {'addSheet': {'properties': json.loads(json.dumps(sheet['properties']))}}
+        if kind == 'duplicateSheet':
+            source = self._sheet(spreadsheet, sheet_id=spec['sourceSheetId'])
+            properties = json.loads(json.dumps(source['properties']))
+            properties.update(title=spec.get('newSheetName') or f"Copy of {properties['title']}",
+                              sheetId=spec.get('newSheetId'))
+            sheet = self._add_sheet(spreadsheet, properties, index=spec.get('insertSheetIndex'),
+                                    cells=[list(line) for line in source['cells']])
+            return {'duplicateSheet': {'properties': json.loads(json.dumps(sheet['properties']))}}
+        if kind == 'updateSheetProperties':
+            properties = spec.get('properties', {})
+            sheet = self._sheet(spreadsheet, sheet_id=properties.get('sheetId', 0))
+            for key, value in properties.items():
+                if key == 'gridProperties':
+                    sheet['properties']['gridProperties'].update({k: int(v) for k, v in value.items()})
+                elif key not in ('sheetId', 'index'):
+                    sheet['properties'][key] = value
+            return {}
+        if kind == 'deleteSheet':
+            sheet = self._sheet(spreadsheet, sheet_id=spec['sheetId'])
+            spreadsheet['sheets'].remove(sheet)
+            for position, other in enumerate(spreadsheet['sheets']):
+                other['properties']['index'] = position
+            return {}
+        if kind == 'appendDimension':
+            grid = self._sheet(spreadsheet, sheet_id=spec.get('sheetId', 0))['properties']['gridProperties']
+            grid['rowCount' if spec.get('dimension') == 'ROWS' else 'columnCount'] += int(spec.get('length', 0))
+            return {}
+        if kind in ('repeatCell', 'updateCells', 'updateBorders', 'mergeCells', 'autoResizeDimensions'):
+            spreadsheet['formats'].append((kind, spec))
+            return {}
+        raise FakeAPIError(400, f'Unsupported request: {kind}')
+
+    # ——————————————————————————— DRIVE ———————————————————————————
+    def _file_resource(self, spreadsheet):
+        return {'kind': 'drive#file', 'id': spreadsheet['id'], 'title': spreadsheet['title'],
+                'mimeType': 'application/vnd.google-apps.spreadsheet',
+                'parents': [{'id': parent} for parent in spreadsheet['parents']],
+                'modifiedDate': spreadsheet['modified'], 'version': str(spreadsheet['version']),
+                'userPermission': {'id': 'me', 'role': 'owner', 'type': 'user'},  # Drive v2 gives the alias
+                'owners': [{'permissionId': 'owner'}]}
+
+    def _drive(self, method, path, params, body):
+        parts = path.strip('/').split('/')
+        if parts == ['files'] and method == 'POST':  # files.insert
+            parents = [parent.get('id') for parent in body.get('parents', []) if parent.get('id')]
+            return self._file_resource(self._file(self.create_spreadsheet(body.get('title', 'Untitled'),
+                                                                          parents=parents)))
+        spreadsheet = self._file(parts[1])
+        if len(parts) == 2:  # files.get / patch
+            if method in ('PATCH', 'PUT') and 'title' in body:
+                spreadsheet['title'] = body['title']
+                self._touch(spreadsheet)
+            return self._file_resource(spreadsheet)
+        if parts[2] == 'copy':
+            copy_id = self.create_spreadsheet(body.get('title', f"Copy of {spreadsheet['title']}"), tabs=(),
+                                              parents=[parent.get('id') for parent in body.get('parents', [])])
+            copy = self.files[copy_id]
+            for sheet in spreadsheet['sheets']:
+                self._add_sheet(copy, json.loads(json.dumps(sheet['properties'])),
+                                cells=[list(line) for line in sheet['cells']])
+            return self._file_resource(copy)
+        if parts[2] != 'permissions':
+            raise FakeAPIError(404, f'Unknown path {path}')
+        permissions = spreadsheet['permissions']
+        if len(parts) == 3 and method == 'GET':
+            return {'kind': 'drive#permissionList', 'items': permissions}
+        if len(parts) == 3 and method == 'POST':
+            permission = {'id': self._new_id('perm-'), 'role': body.get('role', 'reader'),
+                          'type': body.get('type', 'user'), 'emailAddress': body.get('value') or body.get('emailAddress')}
+            permissions.append(permission)
+            return permission
+        permission = next((item for item in permissions if item['id'] == parts[3]), None)
+        if permission is None:
+            raise FakeAPIError(404, f'Permission not found: {parts[3]}')
+        if method == 'DELETE':
+            permissions.remove(permission)
+            return {}
+        permission.update({key: value for key, value in body.items() if key in ('role', 'type', 'emailAddress')})
+        if _param(params, 'transferOwnership', 'false') == 'true':
+            permission['pendingOwner'] = True
+        return permission
+
+
+# ——————————————————————————— CLIENT SIDE ———————————————————————————
+class FakeClientPool(ClientPool):
+    """ ClientPool handing out gspread clients / Drive services wired to a FakeGoogle, no credentials """
+
+    def __init__(self, backend, refresh_ahead=300):
+        super().__init__(refresh_ahead=refresh_ahead)
+        self.backend = backend
+
+    def _credentials(self, entry, count=False):
+        return None
+
+    def client(self, keyfile):
+        import gspread
+        import requests
+        entry = self._entry(keyfile)
+        with entry['lock']:
+            if entry['client'] is None:
+                session = requests.Session()
+                session.mount('https://', FakeSheetsAdapter(self.backend))
+                session.mount('http://', FakeSheetsAdapter(self.backend))
+                entry['client'] = gspread.Client(None, session=session)
+                self._count('clients_built')
+            else:
+                self._count('reuses')
+            return entry['client']
+
+    def drive(self, keyfile):
+        from googleapiclient import discovery
+        entry = self._entry(keyfile)
+        service = getattr(entry['drive'], 'service', None)
+        if service is None:
+            service = discovery.build('drive', 'v2', http=FakeHttp(self.backend), static_discovery=True,
+                                      cache_discovery=False)
+            self._keep_drive(entry, service)
+        else:
+            self._count('reuses')
+        return service
+
+
+class FakeSheetsAdapter(BaseAdapter):
+    """ requests transport adapter answering from a FakeGoogle """
+
+    def __init__(self, backend):
+        super().__init__()
+        self.backend = backend
+
+    def send(self, request, **kwargs):
+        from requests import Response
+        from requests.structures import CaseInsensitiveDict
+        status, headers, content = self.backend.handle(request.method, request.url, request.body)
+        response = Response()
+        response.status_code = status
+        response.headers = CaseInsensitiveDict(headers)
+        response._content = content
+        response.encoding = 'utf-8'
+        response.url = request.url
+        response.request = request
+        response.reason = 'OK' if status < 400 else 'Error'
+        return response
+
+    def close(self):
+        pass
+
+
+class FakeHttp(object):
+    """ httplib2.Http look-alike for googleapiclient answering from a FakeGoogle """
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def request(self, uri, method='GET', body=None, headers=None, redirections=5, connection_type=None):
+        import httplib2
+        status, response_headers, content = self.backend.handle(method, uri, body)
+        info = {key.lower(): value for key, value in response_headers.items()}
+        info['status'] = str(status)
+        return httplib2.Response(info), content
+
+    def close(self):
+        pass
+
+
+# ——————————————————————————— HELPERS ———————————————————————————
+def _now():
+    return datetime.datetime.now(datetime.timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
+
+
+def _param(params, name, default):
+    values = params.get(name)
+    return values[0] if values else default
+
+
+def _cell(a1):
+    match = SIDE_RE.match(a1)
+    return int(match.group(2)), column_to_index(match.group(1))
+
+
+def _bounds(cells, rows, cols, name):
+    """ A1 cells ('A1:B2', 'B', '2:5', 'A:C', 'A2:C', '') -> (row1, col1, row2, col2), open ends go to the grid edge """
+    if not cells:
+        return 1, 1, rows, cols
+    left, _, right = cells.partition(':')
+    sides = []
+    for side in (left, right or left):
+        match = SIDE_RE.match(side)
+        if not match or not (match.group(1) or match.group(2)):
+            raise FakeAPIError(400, f'Unable to parse range: {name}')
+        sides.append((int(match.group(2)) if match.group(2) else None,
+                      column_to_index(match.group(1)) if match.group(1) else None))
+    (row1, col1), (row2, col2) = sides
+    if not right and row1 is not None and col1 is not None:
+        return row1, col1, row1, col1
+    return row1 or 1, col1 or 1, row2 or rows, col2 or cols
+
+
+def _parse(value):
+    """ USER_ENTERED: numbers typed as text become numbers """
+    if isinstance(value, str):
+        text = value.strip()
+        if text and text[0] in '+-.0123456789':
+            try:
+                number = float(text)
+                return int(number) if number.is_integer() and 'e' not in text.lower() and '.' not in text else number
+            except ValueError:
+                return value
+    return value
+
+
+def _render(value, render):
+    if value is None:
+        return ''
+    if render != 'FORMATTED_VALUE':
+        return value
+    if isinstance(value, bool):
+        return 'TRUE' if value else 'FALSE'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _trim(rows):
+    """ Drops trailing empty cells of every row and trailing empty rows, like the API """
+    result = []
+    for line in rows:
+        end = len(line)
+        while end and line[end - 1] in (None, ''):
+            end -= 1
+        result.append(line[:end])
+    while result and not result[-1]:
+        result.pop()
+    return result
@@ -0,0 +1,88 @@
+# import libraries
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from .ranges import parse_range, range_to_a1, quote_title, split_title
+
+logger = logging.getLogger(__name__)
+
+
+# #############################################################################
+# ####### ———————- FAN-OUT READER (values:batchGet) -——————— #################
+# #############################################################################
+# Reads many tabs / ranges with one values:batchGet per spreadsheet
+#
+# A spec is a tab title ('Sales' — whole tab), a range with a title ("'Sales'!A1:C10")
+# or a pair ('Sales', 'A1:C10'). Results are keyed by the spec as it was given.
+
+
+def parse_spec(spec):
+    """ 'Tab' -> ('Tab', None), "'Tab'!A1:B2" / ('Tab', 'A1:B2') -> ('Tab', (1, 1, 2, 2)) """
+    if isinstance(spec, (tuple, list)):
+        tab, range_a1 = spec
+        return tab, parse_range(range_a1) if range_a1 else None
+    tab, cells = split_title(spec)
+    if tab is None:
+        return spec, None  # a bare tab title
+    return tab, parse_range(cells)
+
+
+def _shape(rows, rect):
+    """ Pads rows the way get_all_values (whole tab) or a range read does """
+    if rect is None:
+        width = max((len(row) for row in rows), default=0)
+        return [row + [''] * (width - len(row)) for row in rows]
+    width = rect[3] - rect[1] + 1
+    rows = [row + [''] * (width - len(row)) for row in rows[:rect[2] - rect[0] + 1]]
+    rows.extend([[''] * width for _ in range(rect[2] - rect[0] + 1 - len(rows))])
+    return rows
+
+
+def read_specs(data_source, file_id, specs, cache=None, as_dataframe=True):
+    """ {spec: DataFrame or list of rows} for one spreadsheet, cache misses go in one values:batchGet """
+    parsed = {spec if not isinstance(spec, list) else tuple(spec): parse_spec(spec) for spec in specs}
+    result, missing = {}, []
+    for spec, (tab, rect) in parsed.items():
+        cached = cache.get(file_id, tab, rect) if cache is not None else None
+        if cached is not None:
+            result[spec] = cached
+        else:
+            missing.append(spec)
+    if missing:
+        ranges = [quote_title(parsed[spec][0]) + ('!' + range_to_a1(parsed[spec][1]) if parsed[spec][1] else '')
+                  for spec in missing]
+        for spec, rows in zip(missing, data_source.readBatchValues(ranges, file_id=file_id)):
+            tab, rect = parsed[spec]
+            result[spec] = _shape(rows, rect)
+            if cache is not None:
+                cache.put(file_id, tab, rect, 'FORMATTED_VALUE', result[spec])
+    if as_dataframe:
+        import pandas as pd
+        return {spec: pd.DataFrame(rows) for spec, rows in result.items()}
+    return {spec: [list(row) for row in rows] for spec, rows in result.items()}  # cached rows stay untouched
+
+
+def read_many_files(keyfile, files, max_workers=8, cache=None, as_dataframe=True, limiter=None, pool=None,
+                    metrics=None):
+    """ Reads several spreadsheets in parallel, one values:batchGet each
+
+        frames = read_many_files('<API key file.json>', {'<ID 1>': ['Sales', "'Costs'!A1:D20"],
+                                                         '<ID 2>': [('Plan', 'B2:F40')]})
+        frames['<ID 1>']['Sales']  # DataFrame
+
+        A file that fails to read maps to the exception instead of a dict.
+        limiter / pool / metrics are passed to GoogleSheetsObjects (as for GoogleSheet).
+    """
+    from .google_handler import GoogleSheetsObjects
+    data_source = GoogleSheetsObjects(keyfile=keyfile, cache=cache, limiter=limiter, pool=pool,  # one client for all files
+                                      metrics=metrics)
+
+    def read_file(file_id):
+        try:
+            return read_specs(data_source, file_id, files[file_id], cache=cache, as_dataframe=as_dataframe)
+        except Exception as e:
+            logger.error(f"{file_id}: {e}")
+            return e
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(files)))) as executor:
+        return dict(zip(files, executor.map(read_file, files)))
@@ -0,0 +1,96 @@
+# import libraries
+import math
+import logging
+
+from .ranges import merge_rectangles, grid_range
+
+logger = logging.getLogger(__name__)
+
+CLEAR = 'clear'  # key of the cells whose background is reset
+MAX_MERGE = 1000  # above this many rectangles of one color the (quadratic) exact merge is skipped
+
+
+# #############################################################################
+# ####### ———————- COLOR MASK INTO REPEATCELL RECTANGLES -——————— ############
+# #############################################################################
+def normalize_color(value):
+    """ None / NaN / '' -> None, '#33cc33' / (0.2, 0.8, 0.2) / (51, 204, 51) / {'red': ..} -> (r, g, b) in 0..1 """
+    if value is None or value == '' or (isinstance(value, float) and math.isnan(value)):
+        return None
+    if isinstance(value, str):
+        text = value.lstrip('#')
+        if len(text) != 6:
+            raise ValueError(f"Color {value!r} is not #RRGGBB")
+        rgb = tuple(int(text[i:i + 2], 16) / 255 for i in (0, 2, 4))
+    elif isinstance(value, dict):
+        rgb = (value.get('red', 0), value.get('green', 0), value.get('blue', 0))
+    else:
+        rgb = tuple(float(part) for part in value)[:3]
+        if any(part > 1 for part in rgb):
+            rgb = tuple(part / 255 for part in rgb)
+    return tuple(round(float(part), 4) for part in rgb)
+
+
+def mask_to_grid(mask):
+    """ DataFrame / 2D array / list of rows of colors -> list of rows of normalized colors (None — untouched) """
+    if hasattr(mask, 'to_numpy'):  # DataFrame: the values only, headers are not part of the sheet range
+        mask = mask.to_numpy(dtype=object).tolist()
+    elif hasattr(mask, 'tolist'):
+        mask = mask.tolist()
+    known = {}
+    grid = []
+    for row in mask:
+        line = []
+        for value in row:
+            try:
+                color = known[value]
+            except (KeyError, TypeError):  # unhashable (lists, dicts) are normalized every time
+                color = normalize_color(value)
+                try:
+                    known[value] = color
+                except TypeError:
+                    pass
+            line.append(color)
+        grid.append(line)
+    return grid
+
+
+def color_rectangles(grid, clear=False):
+    """ {color: [0-based (row1, col1, row2, col2)]} covering every colored cell (and empty ones with clear=True)
+
+        Runs of one color in a row are stacked with equal runs of the next rows,
+        then rectangles of one color are merged where the union is exact.
+    """
+    rects = {}
+    open_runs = {}  # (col1, col2, color) -> row1 of the rectangle growing down
+    for row, line in enumerate(grid + [[]]):  # the empty last row closes everything
+        runs, start = [], 0
+        for col in range(1, len(line) + 1):
+            if col == len(line) or line[col] != line[start]:
+                color = line[start] if line[start] is not None else (CLEAR if clear else None)
+                if color is not None:
+                    runs.append((start, col - 1, color))
+                start = col
+        still_open = {}
+        for run in runs:
+            still_open[run] = open_runs.pop(run, row)
+        for (col1, col2, color), row1 in open_runs.items():
+            rects.setdefault(color, []).append((row1, col1, row - 1, col2))
+        open_runs = still_open
+    return {color: merge_rectangles(found) if len(found) <= MAX_MERGE else found for color, found in rects.items()}
+
+
+def repeat_cell_requests(sheet_id, rects, row=1, col=1):
+    """ repeatCell requests for the rectangles anchored at (row, col), one per rectangle """
+    requests = []
+    for color, found in rects.items():
+        if color == CLEAR:
+            cell, fields = {'userEnteredFormat': {}}, 'userEnteredFormat.backgroundColor'
+        else:
+            cell = {'userEnteredFormat': {'backgroundColor': dict(zip(('red', 'green', 'blue'), color))}}
+            fields = 'userEnteredFormat.backgroundColor'
+        for row1, col1, row2, col2 in found:
+            requests.append({'repeatCell': {
+                'range': grid_range(sheet_id, (row + row1, col + col1, row + row2, col + col2)),
+                'cell': cell, 'fields': fields}})
+    return requests
@@ -1,45 +1,41 @@
 # import libraries
-import time
 import os
 import logging
 import argparse
 import json
 import csv
+import gzip
 import itertools
-import string
-import re
+import contextlib
 # import pandas as pd
 
-import gspread
-from googleapiclient import discovery
-from googleapiclient.errors import HttpError
-
-from oauth2client.service_account import ServiceAccountCredentials
-
-import pandas as pd
+from .batching import SheetBatch
+from .columns import build_columns
+from .formatting import mask_to_grid, color_rectangles, repeat_cell_requests, CLEAR
+from .fanout import read_specs
+from .lazy import LazyModule, enable_logging
+from .metadata import SheetIndex, METADATA_FIELDS
+from .metrics import Metrics
+from .projection import header_index, column_groups, row_blocks, rows_bounds, fetch_blocks
+from .throttle import RateLimiter, is_rejected
+from .pool import ClientPool, SCOPE
+from .ranges import parse_range, range_to_a1, quote_title, column_to_index, grid_range, overlaps
+from .sync import frame_to_grid, pad_grid, changed_rectangles
+from .writer import DataFrameWriter, frame_to_rows
+
+# heavy libraries are imported on first use, `import agg_spreads` stays fast
+gspread = LazyModule('gspread')
+gspread_urls = LazyModule('gspread.urls')
+api_errors = LazyModule('googleapiclient.errors')
+pd = LazyModule('pandas')
+np = LazyModule('numpy')
 
 
 # #############################################
-# ############ ENABLE LOGGING #################
+# ############ LOGGING (opt-in) ###############
 # #############################################
-# create logger
+# the application configures logging, see agg_spreads.enable_logging()
 logger = logging.getLogger(__name__)
-logging.basicConfig(filename=f'{__file__}.log', 
-                    level=logging.INFO, 
-                    format='%(asctime)s: /%(name)s/ %(levelname)s: %(message)s', 
-                    datefmt='%m/%d/%Y %I:%M:%S %p')
-logger.setLevel(logging.DEBUG)  # ALWAYS DEBUG in FILE
-# create console handler and set level to debug
-lg = logging.StreamHandler()
-lg.setLevel(logging.INFO)
-# create formatter
-formatter = logging.Formatter(fmt='%(asctime)s: /%(name)s/ %(levelname)s: %(message)s', 
-                              datefmt='%m/%d/%Y %I:%M:%S %p')
-# add formatter to secondary logger
-lg.setFormatter(formatter)
-# add ch to logger
-logger.addHandler(lg)  # when call logger both will destinations will be filled
-#######################################
 
 
 # ############### ———————————————————————————————————— #########################
@@ -57,40 +53,62 @@ class GoogleSheetsObjects(object):
     GS_tab = GS.workingSheet # a tab in the file (to access) 
     """
 
-    def __init__(self, keyfile):
+    def __init__(self, keyfile, cache=None, limiter=None, pool=None, metrics=None):
         logger.info("Initializing API...")
         from string import ascii_uppercase 
         # Create a scope of rights
-        self.scope = ['https://spreadsheets.google.com/feeds', 'https://www.googleapis.com/auth/drive']
-        # create some credential using that scope and content of startup_funding.json
+        self.scope = SCOPE
         self.keyfile = os.path.join("./", keyfile)
-        self.creds = ServiceAccountCredentials.from_json_keyfile_name(self.keyfile, self.scope)
-        # create gspread authorize using that credential
-        self.client = gspread.authorize(self.creds)
+        # credentials and authorized client are parsed / built once per keyfile and reused by the pool
+        self.pool = pool or ClientPool.shared()
+        self.creds = self.pool.credentials(self.keyfile)
+        self.client = self.pool.client(self.keyfile)
         self.file_title = None  # Google sheet filename (title)
         self.file_id = None  # Google sheet Google file ID
         self.wks = None  # Object with Google sheet file
         self.workingSheet = None  # a working sheet
+        self.index = None  # SheetIndex: titles, ids and sizes of the tabs, one fetch per file
         self.column_template = ascii_uppercase
-        self.drive_service = None  # Google Drive object 
+        self.batch = None  # Write-behind buffer (SheetBatch) while batch mode is on
+        self.write_listeners = []  # callables (tab title, rect) told about value writes and clears
+        self.cache = cache  # Read-through cache (RangeCache), optional
+        self.limiter = limiter or RateLimiter.shared()  # quota, backoff and retries for every API call
+        self.metrics = metrics or Metrics.shared()  # per-call spans and counters, a no-op unless enabled
+        self.metrics.watch_session(self.client)
+
+    @property
+    def drive_service(self):
+        """ Drive v2 service of the calling thread from the pool (httplib2 is not thread-safe, never kept here) """
+        return self.pool.drive(self.keyfile)
+
+    def _written(self, title, rect=None):
+        """ Tells the listeners that values of the tab (rect, None — anywhere) change """
+        for listener in self.write_listeners:
+            listener(tab=title, rect=rect)
+
+    def api_call(self, func, *args, **kwargs):
+        """ Runs a gspread / Drive call through the rate limiter (retries 429/5xx with backoff) """
+        if not self.metrics.enabled:
+            return self.limiter.call(func, *args, user=self.keyfile, **kwargs)
+        return self.metrics.measure(self.limiter, func, args, kwargs, user=self.keyfile, spreadsheet=self.file_id)
 
     def create_file(self, title: str = "Untitled", parent_folder_id: str = None):
         """ Creates a new Google spreadsheet """
         api_response = {}
-        if not self.drive_service:
-            self.drive_service = discovery.build('drive', 'v2', credentials=self.creds)
         file_metadata = {
             'title': title,  
             'mimeType': 'application/vnd.google-apps.spreadsheet',
             }
         file_metadata['parents'] = [{'id': parent_folder_id}] if parent_folder_id else []
         try:
-            api_response = self.drive_service.files().insert(body=file_metadata).execute()  # Creates file in the folder
+            # Creates file in the folder, sent again only if refused by quota: after a 5xx the file may exist
+            api_response = self.api_call(self.drive_service.files().insert(body=file_metadata).execute,
+                                         retry_if=is_rejected)
             self.file_title = api_response.get('title', None)
             self.file_id = api_response.get('id', None)
             self.openWorksheet(fileID=self.file_id)
             logger.info(f"🔗 CREATED: https://docs.google.com/spreadsheets/d/{self.file_id}/edit?usp=drivesdk")
-        except HttpError as http_e:
+        except api_errors.HttpError as http_e:
             if http_e.resp.status in [403, 500, 503]:
                 api_response['details'] = 'a rate limit error'    
             logger.error(f"details: {http_e.error_details[0]}")
@@ -101,28 +119,43 @@ class GoogleSheetsObjects(object):
         self.openWorksheet(fileID=self.file_id, page=0)
         return self.workingSheet
 
-    def share_file(self, email=None):
-        """ Share file of the file """
-        api_response = {}
-        if not email:
-            api_response['details'] = 'empty email'
-            return api_response
-        new_permissions = {
+    @staticmethod
+    def share_body(email):
+        """ Drive v2 permission giving the email write access """
+        return {
             'type': 'group',
             'role': 'writer',
             'sendNotificationEmails': 'true',
             'emailAddress': email,
             'value': email
             }
+
+    @staticmethod
+    def owner_body(email):
+        """ Drive v2 permission update moving the ownership to the email """
+        return {
+            'type': 'group',
+            'transferOwnership': 'true', 
+            'pendingOwner': 'true',  
+            # 'role': 'owner',  # V3 requirement
+            'emailAddress': email,
+            'value': email 
+            }
+
+    def share_file(self, email=None):
+        """ Share file of the file """
+        api_response = {}
+        if not email:
+            api_response['details'] = 'empty email'
+            return api_response
+        new_permissions = self.share_body(email)
         try:            
             # Get permission ID
-            if not self.drive_service:
-                self.drive_service = discovery.build('drive', 'v2', credentials=self.creds)            
 
             # Changer writer
-            api_response = self.drive_service.permissions().insert(fileId=self.file_id, 
-                                    body=new_permissions, ).execute()
-        except HttpError as http_e:
+            api_response = self.api_call(self.drive_service.permissions().insert(fileId=self.file_id, 
+                                         body=new_permissions, ).execute)
+        except api_errors.HttpError as http_e:
             if http_e.resp.status in [403, 500, 503]:
                 api_response['details'] = 'a rate limit error'    
             return http_e.error_details[0]
@@ -139,28 +172,19 @@ class GoogleSheetsObjects(object):
             return api_response
 
         # Change ownership
-        change_owner_permissions = {
-            'type': 'group',
-            'transferOwnership': 'true', 
-            'pendingOwner': 'true',  
-            # 'role': 'owner',  # V3 requirement
-            'emailAddress': email,
-            'value': email 
-            }            
+        change_owner_permissions = self.owner_body(email)
         try:
-            if not self.drive_service:
-                self.drive_service = discovery.build('drive', 'v2', credentials=self.creds)
             # Get list of permissions
-            permission_list = self.drive_service.permissions().list(fileId=self.file_id).execute() 
+            permission_list = self.api_call(self.drive_service.permissions().list(fileId=self.file_id).execute)
             permission_id = permission_list['items'][0]['id']  
             # Get update permissions with a new owner
-            api_response = self.drive_service.permissions().update(  
-                                    fileId=self.file_id, 
-                                    body=change_owner_permissions, 
-                                    permissionId=permission_id,
-                                    transferOwnership=True, 
-                                    ).execute()    
-        except HttpError as http_e:
+            api_response = self.api_call(self.drive_service.permissions().update(  
+                                         fileId=self.file_id, 
+                                         body=change_owner_permissions, 
+                                         permissionId=permission_id,
+                                         transferOwnership=True, 
+                                         ).execute)
+        except api_errors.HttpError as http_e:
             if http_e.resp.status in [403, 500, 503]:
                 api_response['details'] = 'a rate limit error'    
             return http_e.error_details[0]
@@ -170,28 +194,24 @@ class GoogleSheetsObjects(object):
         return api_response
 
     def batch_update(self, update):
-        result = self.workingSheet.batch_update(update)
+        result = self.api_call(self.workingSheet.batch_update, update)
         return result 
 
     def openWorksheet(self, fileID='', page=0, tab_name=None):
         ''' Open Google sheet by ID key '''
         logger.info("Opening google sheet...")
-        # Now will can access our google sheets we call client.open on StartupName
+        if self.batch is not None and fileID != self.file_id:
+            self.batch.flush()  # pending requests belong to the previous file
+        # One spreadsheets.get with a narrow fields mask — tabs are then opened from the index
         try:
-            self.wks = self.client.open_by_key(fileID)  # Open by Sheet ID
-            # self.wks = self.client.open(filename) # Open by Sheet filename
+            self.index = SheetIndex(self.fetchMetadata(fileID))
+            self.wks = self._spreadsheet(fileID, self.index.properties)  # Open by Sheet ID
         except gspread.exceptions.APIError as e:
             raise e
-            error_message = json.loads(str(e))
-            logger.critical("Error {}: {}".format(error_message['error']['code'], error_message['error']['message']))
-            return None
         logger.debug("Opening sheet...")
         try:
-            if tab_name:
-                self.workingSheet = self.wks.worksheet(tab_name)
-            else:
-                self.workingSheet = self.wks.get_worksheet(page)  # Select a working sheet in the file
             self.file_id = fileID
+            self.workingSheet = self.worksheet(title=tab_name, page=page)  # Select a working sheet in the file
         except gspread.exceptions.APIError as e:
             error_message = json.loads(str(e))
             # error_message = json.loads('{error: str(e)}")
@@ -211,15 +231,50 @@ class GoogleSheetsObjects(object):
         logger.debug("--------")            
         return self.workingSheet
 
+    def fetchMetadata(self, file_id=None):
+        """ spreadsheets.get of the title and tab properties only (METADATA_FIELDS) """
+        params = {'fields': METADATA_FIELDS, 'includeGridData': 'false'}
+        file_id = file_id or self.file_id
+        if hasattr(self.client, 'http_client'):  # gspread 6
+            return self.api_call(self.client.http_client.fetch_sheet_metadata, file_id, params=params)
+        return self.api_call(self.client.request, 'get', gspread_urls.SPREADSHEET_URL % file_id, params=params).json()
+
+    def refreshIndex(self):
+        """ Reloads the tab index (tabs added or renamed outside of this object) """
+        self.index.load(self.fetchMetadata(self.file_id))
+        self.wks._properties.update(self.index.properties)
+        return self.index
+
+    def _spreadsheet(self, file_id, properties):
+        """ gspread Spreadsheet from known properties (its constructor would fetch metadata again) """
+        spreadsheet = gspread.Spreadsheet.__new__(gspread.Spreadsheet)
+        spreadsheet.client = getattr(self.client, 'http_client', self.client)  # gspread 6 / gspread 5
+        spreadsheet._properties = dict(properties, id=file_id)
+        return spreadsheet
+
+    def worksheet(self, title=None, page=0):
+        """ gspread Worksheet of the opened file by title (or position), from the index — no API call """
+        properties = self.index.by_title(title) if title else self.index.by_index(page)
+        if properties is None:
+            raise gspread.exceptions.WorksheetNotFound(title if title else f"index {page} not found")
+        if hasattr(self.client, 'http_client'):  # gspread 6
+            return gspread.Worksheet(self.wks, properties, self.file_id, self.client.http_client)
+        return gspread.Worksheet(self.wks, properties)
+
     def clearRange(self, google_sheet_pointer, line1=0, line2=0, column1='A', column2='A'):
         result = None
         try:
             # range_pointer = google_sheet_pointer.range(range_to_delete)
             # range_2_delete = google_sheet_pointer.range(range_to_delete)
             sheet_title = google_sheet_pointer.title
+            self._written(sheet_title, parse_range('{}{}:{}{}'.format(column1, line1, column2, line2)))
+            if self.batch is not None:
+                return self.batch.queue_clear(google_sheet_pointer, '{}{}:{}{}'.format(column1, line1, column2, line2))
             range_to_delete = "'{}'!{}{}:{}{}".format(sheet_title, column1, line1, column2, line2)  # read columns A to N from second row 
             # logger.info(range_to_delete)
-            result = self.wks.values_clear(range_to_delete)
+            result = self.api_call(self.wks.values_clear, range_to_delete)
+            if self.cache is not None:
+                self.cache.patch_clear(self.file_id, sheet_title, parse_range('{}{}:{}{}'.format(column1, line1, column2, line2)))
         except Exception as e:
             logger.error(e)
         return result
@@ -233,7 +288,7 @@ class GoogleSheetsObjects(object):
             lines = google_sheet_pointer.row_count  # read the maximum lines
         range_to_read = '{}{}:{}{}'.format(column1, line1, column2, line2)  # read columns A to N from second row 
         try:  # Reading all table data at once
-            result = google_sheet_pointer.range(range_to_read)
+            result = self.api_call(google_sheet_pointer.range, range_to_read)
             # result = self.wks.sheet1.range('A1:N1')
         except gspread.exceptions.APIError as e:
             error_message = json.loads(str(e))
@@ -241,41 +296,131 @@ class GoogleSheetsObjects(object):
             return "Error {}: {}".format(error_message['error']['code'], error_message['error']['message'])
         return result
 
+    def readRangeValues(self, google_sheet_pointer, range_a1, render='FORMATTED_VALUE'):
+        """ Rows of the range straight from values.get (no Cell objects), trailing empty cells are trimmed by API """
+        sheet_range = '{}!{}'.format(quote_title(google_sheet_pointer.title), range_a1)
+        response = self.api_call(self.wks.values_get, sheet_range, params={'valueRenderOption': render, 'majorDimension': 'ROWS'})
+        return response.get('values', [])
+
+    def fileVersion(self, file_id=None):
+        """ (version, modifiedDate) of the file from one Drive files.get — a cheap change check """
+        response = self.api_call(self.drive_service.files().get(fileId=file_id or self.file_id,
+                                                                fields='version,modifiedDate').execute)
+        return response.get('version'), response.get('modifiedDate')
+
+    def readRangeColumns(self, google_sheet_pointer, range_a1=None):
+        """ Columns of the range (whole tab if None) as unformatted values, dates as serial numbers """
+        sheet_range = quote_title(google_sheet_pointer.title) + (f'!{range_a1}' if range_a1 else '')
+        response = self.api_call(self.wks.values_get, sheet_range,
+                                 params={'valueRenderOption': 'UNFORMATTED_VALUE', 'majorDimension': 'COLUMNS',
+                                         'dateTimeRenderOption': 'SERIAL_NUMBER'})
+        return response.get('values', [])
+
+    def readBatchValues(self, ranges, file_id=None, render='FORMATTED_VALUE', major='ROWS'):
+        """ Rows (columns with major='COLUMNS') of every range (with titles) in one values:batchGet, no metadata fetch """
+        params = {'valueRenderOption': render, 'majorDimension': major}
+        file_id = file_id or self.file_id
+        if hasattr(self.client, 'http_client'):  # gspread 6
+            response = self.api_call(self.client.http_client.values_batch_get, file_id, ranges, params=params)
+        else:
+            params['ranges'] = ranges
+            response = self.api_call(self.client.request, 'get', gspread_urls.SPREADSHEET_VALUES_BATCH_URL % file_id, params=params).json()
+        return [value_range.get('values', []) for value_range in response.get('valueRanges', [])]
+
     def updateRangeColor(self, google_sheet_pointer, 
                          column1='B', line1=2,  
                          column2='B', line2=2, 
                          red=0.2, green=0.8, blue=0.2):
         coloring_range = '{}{}:{}{}'.format(column1, line1, column2, line2)
-        result = google_sheet_pointer.format(coloring_range, {"backgroundColor": 
-                                                               {"red": red,  # noqa: E127
-                                                                "green": green, 
-                                                                "blue": blue}})
+        cell_format = {"backgroundColor": {"red": red, "green": green, "blue": blue}}
+        if self.batch is not None:
+            return self.batch.queue_format(google_sheet_pointer, coloring_range, cell_format)
+        result = self.api_call(google_sheet_pointer.format, coloring_range, cell_format)
 
         return result
 
-    def saveWorksheetToCSV(self, google_sheet_pointer, filename='googleSheet'):
-        result = {}
+    def iterRows(self, google_sheet_pointer, chunk_rows=5000, render='FORMATTED_VALUE', width=None):
+        """ Pages through the tab with values.get windows of `chunk_rows` whole rows, yields lists of rows
+
+            Every row has the same width: by default the tab's col_count (from the index, no API call), so no
+            cell is lost. A smaller `width` asked by the caller cuts the cells right of it.
+            Trailing empty rows are not yielded (same as get_all_values), so memory depends on chunk_rows
+            and not on the tab size.
+        """
+        self._sync_grid(google_sheet_pointer)
+        width = width or google_sheet_pointer.col_count
+        pending_empty = 0  # empty rows that are yielded only if some data comes after them
+        for row1 in range(1, google_sheet_pointer.row_count + 1, chunk_rows):
+            row2 = min(row1 + chunk_rows - 1, google_sheet_pointer.row_count)
+            rows = self.readRangeValues(google_sheet_pointer, f'{row1}:{row2}', render=render)
+            if not any(rows):
+                pending_empty += row2 - row1 + 1
+                continue
+            while pending_empty:
+                size = min(pending_empty, chunk_rows)
+                yield [[''] * width for _ in range(size)]
+                pending_empty -= size
+            yield [row[:width] + [''] * (width - len(row)) for row in rows]
+            pending_empty = row2 - row1 + 1 - len(rows)
+
+    def saveWorksheetToCSV(self, google_sheet_pointer, filename='googleSheet', chunk_rows=5000, compress=False,
+                           width=None):
+        """ Streams the tab to filename.csv (or filename.csv.gz with compress=True) chunk by chunk """
         result = {'error': False, 'status': ''}
+        filename = filename + ('.csv.gz' if compress else '.csv')
         try:
-            with open(filename + '.csv', 'w', newline='') as f:
+            opener = gzip.open if compress else open
+            with opener(filename, 'wt', newline='') as f:
                 writer = csv.writer(f)
-                writer.writerows(google_sheet_pointer.get_all_values())
-            result['status'] = filename+'.csv'  # if ok, return actual filename
+                for chunk in self.iterRows(google_sheet_pointer, chunk_rows=chunk_rows, width=width):
+                    writer.writerows(chunk)
+            result['status'] = filename  # if ok, return actual filename
         except Exception as e:
             result['error'] = True
             result['status'] = e
         return result
 
     def add_worksheet(self, title, rows, cols):
-        result = self.wks.add_worksheet(title=title, rows=rows, cols=cols)
+        result = self.api_call(self.wks.add_worksheet, title=title, rows=rows, cols=cols)
+        self.index.add(result._properties)
+        return result
+
+    def _sync_grid(self, google_sheet_pointer):
+        """ Copies the tab size from the index into the pointer (another pointer of the tab may have grown it) """
+        properties = self.index.by_id(google_sheet_pointer.id) if self.index is not None else None
+        if properties and 'gridProperties' in properties:
+            google_sheet_pointer._properties.setdefault('gridProperties', {}).update(properties['gridProperties'])
+
+    def ensureGridSize(self, google_sheet_pointer, rows, cols):
+        """ Grows the tab (never shrinks it) so rows x cols fit, the index and the pointers get the new size """
+        self._sync_grid(google_sheet_pointer)
+        if rows <= google_sheet_pointer.row_count and cols <= google_sheet_pointer.col_count:
+            return None
+        rows, cols = max(rows, google_sheet_pointer.row_count), max(cols, google_sheet_pointer.col_count)
+        result = self.api_call(google_sheet_pointer.resize, rows=rows, cols=cols)
+        # only after a successful resize
+        google_sheet_pointer._properties.setdefault('gridProperties', {}).update({'rowCount': rows,
+                                                                                 'columnCount': cols})
+        if self.index is not None:
+            self.index.resize(google_sheet_pointer.id, rows, cols)
+        if self.workingSheet is not None and self.workingSheet.id == google_sheet_pointer.id:
+            self._sync_grid(self.workingSheet)
         return result
 
     def update_range_by_corner(self, google_sheet_pointer, corner='A1', data=[[]]):
-        if len(data[0]) == 0: 
-            return  # empty request
+        if not any(len(row) for row in data):
+            return  # empty request (an empty first row alone is fine)
+        row1, col1, *_ = parse_range(corner)
+        self._written(google_sheet_pointer.title,
+                      (row1, col1, row1 + len(data) - 1, col1 + max(len(row) for row in data) - 1))
+        if self.batch is not None:
+            return self.batch.queue_update(google_sheet_pointer, corner=corner, data=data)
         # update_array = np.array(data)
         # result = google_sheet_pointer.update(corner, update_array.tolist())
-        result = google_sheet_pointer.update(corner, data, raw=False)
+        result = self.api_call(google_sheet_pointer.update, corner, data, raw=False)
+        if self.cache is not None:
+            self.cache.invalidate(self.file_id, google_sheet_pointer.title,
+                                  (row1, col1, row1 + len(data) - 1, col1 + max(len(row) for row in data) - 1))
         return result
 
 
@@ -291,12 +436,18 @@ class GoogleSheet(object):
         Do not forget to share with google key service account: example: `getgooglesheets@<your-app-name>.iam.gserviceaccount.com`
     """
 
-    def __init__(self, keyfile, sheetID=None, tab_name=None, title="Untitled", email=None, folder_id=None):
+    def __init__(self, keyfile, sheetID=None, tab_name=None, title="Untitled", email=None, folder_id=None, cache=None,
+                 limiter=None, pool=None, metrics=None, snapshot_store=None):
         self.active_sheet = None
-        self.row_count = 0
         self.sheetID = sheetID
+        self.cache = cache  # RangeCache to serve repeated reads from, optional
+        self.snapshot_store = snapshot_store  # SnapshotStore on disk shared by processes for whole-tab reads, optional
+        self._snapshots = {}  # (sheet id, row, col) -> grid last written there by sync_dataframe
+        self._headers = {}  # (sheet id, header row) -> {name: column} for read_columns
         # ——— Open Google sheet
-        self.data_source = GoogleSheetsObjects(keyfile=keyfile)  # Open Google Sheet with using key file 
+        self.data_source = GoogleSheetsObjects(keyfile=keyfile, cache=cache, limiter=limiter, pool=pool,  # Open Google Sheet with using key file
+                                               metrics=metrics)
+        self.data_source.write_listeners.append(self._forget_version)  # writes / clears of the data source
         if not sheetID:
             # Please, create file
             if not email:
@@ -316,13 +467,52 @@ class GoogleSheet(object):
                 self.active_sheet = self.data_source.openWorksheet(fileID=self.sheetID, page=0)  # open sheet in file
         self.sheetTitle = self.active_sheet.title
         self.file_handler = self.data_source.wks
-        self.row_count = self.active_sheet.row_count if self.active_sheet else 0
-        self.sheetsList = [x.title for x in self.file_handler.worksheets()]
+        self.sheetsList = self.data_source.index.titles()
         logger.info(f'Open sheet: {self.sheetTitle}')
         # DEBUG ** update_result = self.data_source.update_range_by_corner(self.active_sheet, corner='A1', data=[['-'.join(self.sheetTitle.split(' '))]])
 
+    @contextlib.contextmanager
+    def batch(self, max_ops=1000, max_bytes=4 * 1024 * 1024, max_delay=10.0):
+        """ Buffers writes, clears and colors and sends them in as few calls as possible
+
+            with GoogleSheetTable.batch() as batch:
+                GoogleSheetTable.update_range_by_corner('A1', [['a']])
+                GoogleSheetTable.update_range_by_corner('B1', [['b']])  # goes with A1 in one range
+            print(batch.reports[-1])  # {'requests': 1, 'bytes': ..., ...}
+
+            Flushes on exit, on `flush()` and when max_ops / max_bytes / max_delay (seconds) reached.
+            If the block (or the flush on exit) raises, requests still queued are dropped and logged.
+        """
+        if self.data_source.batch is not None:  # nested — the outer block flushes
+            yield self.data_source.batch
+            return
+        batch = SheetBatch(self.data_source, max_ops=max_ops, max_bytes=max_bytes, max_delay=max_delay)
+        self.data_source.batch = batch
+        try:
+            yield batch
+            batch.flush()
+        finally:
+            self.data_source.batch = None
+            dropped = batch.discard()
+            if dropped:
+                logger.warning(f"Batch aborted, {dropped} queued requests dropped")
+
+    def flush(self):
+        """ Sends buffered requests now (batch mode only), returns flush report """
+        if self.data_source.batch is None:
+            return None
+        return self.data_source.batch.flush()
+
+    @property
+    def row_count(self):
+        """ Rows of the active tab, as the index knows them (follows ensureGridSize) """
+        if self.active_sheet is None:
+            return 0
+        self.data_source._sync_grid(self.active_sheet)
+        return self.active_sheet.row_count
+
     def get_sheet_by_name(self, name):
-        self.active_sheet = self.data_source.wks.worksheet(name)
+        self.active_sheet = self.data_source.worksheet(title=name)  # from the index, no API call
         self.sheetTitle = self.active_sheet.title
         return self.sheetTitle    
 
@@ -331,18 +521,28 @@ class GoogleSheet(object):
         logger.info(f'Selected other sheet {self.active_sheet.title}')
         return
 
-    def update_sheets_list(self):
-        self.sheetsList = [x.title for x in self.file_handler.worksheets()]
+    def update_sheets_list(self, refresh=False):
+        """ Tab titles from the index, refresh=True fetches them again (tabs changed by someone else) """
+        if refresh:
+            self.data_source.refreshIndex()
+        self.sheetsList = self.data_source.index.titles()
         return self.sheetsList    
 
     def add_worksheet(self, title, rows=100, cols=255):
         result = self.data_source.add_worksheet(title=title, rows=f'{rows}', cols=f'{cols}')
+        if self.cache is not None:
+            self.cache.invalidate(self.sheetID, tab=title)
         self.update_sheets_list()
         return result
 
     def rename_sheet(self, newtitle):
-        self.sheetTitle = self.active_sheet.update_title(newtitle)
+        old_title = self.active_sheet.title
+        self.sheetTitle = self.data_source.api_call(self.active_sheet.update_title, newtitle)
         self.sheetTitle = self.active_sheet.title
+        self.data_source.index.rename(self.active_sheet.id, self.sheetTitle)
+        self.update_sheets_list()
+        if self.cache is not None:
+            self.cache.rename_tab(self.sheetID, old_title, self.sheetTitle)
         # update_result = self.data_source.update_range_by_corner(self.active_sheet, corner='A1', data=[['-'.join(self.sheetTitle.split(' '))]])
         return self.sheetTitle  
 
@@ -355,7 +555,10 @@ class GoogleSheet(object):
             insert_index = len(self.sheetsList) 
         try:
             self.get_sheet_by_name(title)
-            self.file_handler.duplicate_sheet(self.active_sheet.id, insert_sheet_index=insert_index, new_sheet_id=None, new_sheet_name=new_title)
+            new_sheet = self.data_source.api_call(self.file_handler.duplicate_sheet, self.active_sheet.id, insert_sheet_index=insert_index, new_sheet_id=None, new_sheet_name=new_title)
+            self.data_source.index.add(new_sheet._properties)
+            if self.cache is not None:
+                self.cache.invalidate(self.sheetID, tab=new_title)
             self.update_sheets_list()
             self.get_sheet_by_name(new_title)
         except Exception as e:
@@ -363,19 +566,46 @@ class GoogleSheet(object):
         return 'Success'
 
     def get_all_values(self):
-        """ Read values from sheet, wait if error """
+        """ Read values from sheet, a fresh list of row copies (the cache and snapshots keep their own) """
+        return [list(row) for row in self._all_values()]
+
+    def _all_values(self):
+        """ Rows of the tab, the cached list itself on a cache hit — callers must not modify them """
         all_values = []
-        for x in range(10):
-            try:
-                all_values = self.active_sheet.get_all_values()
-                break
-            except Exception as e:
-                # try to wait for data... 
-                logger.error(f"{e}")
-                time.sleep(x * 2)
+        if self.cache is not None:
+            cached = self.cache.get(self.sheetID, self.active_sheet.title)
+            if cached is not None:
+                return cached
+        try:
+            if self.snapshot_store is not None:
+                snapshot = self.snapshot_store.fetch(self.data_source, self.sheetID, self.active_sheet.title,
+                                                     lambda: self.data_source.api_call(self.active_sheet.get_all_values))
+                all_values = snapshot.rows()  # decoded for this read only, the mapping stays shared
+            else:
+                all_values = self.data_source.api_call(self.active_sheet.get_all_values)  # retries 429/5xx with backoff
+        except Exception as e:
+            logger.error(f"{e}")
+            return all_values  # nothing read — nothing to cache
+        if self.cache is not None:
+            self.cache.put(self.sheetID, self.active_sheet.title, None, 'FORMATTED_VALUE', all_values)
         return all_values
 
-    def read_sheet_to_dataframe(self, corner=None, width=None, heigh=None, range_a1=None):
+    def _read_range(self, rect):
+        """ Rows of the rectangle padded with '', from cache when it has the range or a range around it """
+        if self.cache is not None:
+            cached = self.cache.get(self.sheetID, self.active_sheet.title, rect)
+            if cached is not None:
+                return cached
+        rows = self.data_source.readRangeValues(self.active_sheet, range_to_a1(rect))
+        width = rect[3] - rect[1] + 1
+        rows = [row + [''] * (width - len(row)) for row in rows]  # API trims empty cells at the row end
+        rows.extend([[''] * width for _ in range(rect[2] - rect[0] + 1 - len(rows))])  # ...and empty rows at the end
+        if self.cache is not None:
+            self.cache.put(self.sheetID, self.active_sheet.title, rect, 'FORMATTED_VALUE', rows)
+        return rows
+
+    def read_sheet_to_dataframe(self, corner=None, width=None, heigh=None, range_a1=None, typed=False, header_row=1,
+                                dtypes=None):
         """ Reads datat from current tab to pandas DataFrame object
             all none — read all
 
@@ -384,53 +614,140 @@ class GoogleSheet(object):
             heigh=12 — read tvelve rows
             
             range='A1:C18' — Just range 'A1:C18' rectangle from A1 to C18 (3x18) 
+
+            typed=True — columns named by header_row with numbers, bools and dates (see read_sheet_to_columns)
         """
-        colmns_list = list(string.ascii_uppercase)
-        colmns_list.extend([f"A{x}" for x in string.ascii_uppercase])
         try:
+            if typed:
+                if corner and heigh:
+                    row, col, *_ = parse_range(corner)
+                    range_a1 = range_to_a1((row, col, row + heigh - 1, col + width - 1))
+                return pd.DataFrame(self.read_sheet_to_columns(range_a1=range_a1, header_row=header_row, dtypes=dtypes))
+
             if corner and heigh:
-                # corner + size
-                # print(re.split(r'(\d+)', corner))   ## ** sanity check **
-                y, x, *_ = re.split(r'(\d+)', corner)
-                x1 = int(x) + heigh - 1
-                y1_idx = colmns_list.index(y) + width - 1
-                # print(f"line1={x}, line2={x1}, column1={y}, column2={colmns_list[y1_idx]}")  # ** sanity check **
-                data_list = [x.value for x in self.data_source.readRange(
-                                self.active_sheet, line1=x, line2=x1, column1=y, column2=colmns_list[y1_idx])]  # get values 
-                dataframe = pd.DataFrame( 
-                    [data_list[i:i + width] for i in range(0, len(data_list), width)]  # split on sublists for DF table
-                    )
+                # corner + size, any column (A..ZZZ)
+                row, col, *_ = parse_range(corner)
+                dataframe = pd.DataFrame(self._read_range((row, col, row + heigh - 1, col + width - 1)))
             
             elif range_a1:
                 # read by range
-                left, right = range_a1.split(':')
-                y, x, *_ = re.split(r'(\d+)', left)
-                y1, x1, *_ = re.split(r'(\d+)', right)
-                width = colmns_list.index(y1) - colmns_list.index(y) + 1
-                print(colmns_list.index(y1), colmns_list.index(y))
-                print(f"line1={x}, line2={x1}, column1={y}, column2={y1}, width={width}")  # ** sanity check **
-                data_list = [x.value for x in self.data_source.readRange(
-                                self.active_sheet, line1=x, line2=x1, column1=y, column2=y1)]  # get values 
-                dataframe = pd.DataFrame( 
-                    [data_list[i:i + width] for i in range(0, len(data_list), width)]  # split on sublists for DF table
-                    )
+                dataframe = pd.DataFrame(self._read_range(parse_range(range_a1)))
             
             else:
-                dataframe = pd.DataFrame(self.get_all_values())
+                dataframe = pd.DataFrame(self._all_values())
             # print(dataframe.head(n=10)) # DEBUG * DEBUG * DEBUG
             return dataframe
         except Exception as e:
             logger.error(f"{e}")
             return pd.DataFrame() 
 
+    def read_sheet_to_columns(self, range_a1=None, header_row=1, dtypes=None, backend='numpy'):
+        """ Typed columns of the tab (or range): {name: NumPy array}, one values.get, no cache
+
+            columns = GoogleSheetTable.read_sheet_to_columns(dtypes={'Date': 'datetime', 'Qty': 'int64'})
+            columns['Price']  # array([9.99, 12.5, nan]) — unformatted values, no string re-parsing
+
+            header_row — row with the names inside the range (None — no header, names are column letters);
+            dtypes — one dtype or {name: dtype}, inferred when missing; date serials need 'datetime' / 'date';
+            backend='arrow' — pyarrow arrays instead (pip3 install pyarrow).
+        """
+        left = (range_a1 or 'A').split(':')[0].replace('$', '')
+        first_col = column_to_index(''.join(itertools.takewhile(str.isalpha, left)) or 'A')
+        columns = self.data_source.readRangeColumns(self.active_sheet, range_a1)
+        return build_columns(columns, header_row=header_row, dtypes=dtypes, first_col=first_col, backend=backend)
+
+    def _header_index(self, header_row=1, refresh=False):
+        """ {name: column} of the header row of the current tab, read once and kept until a write """
+        key = (self.active_sheet.id, header_row)
+        if refresh or key not in self._headers:
+            rows = self.data_source.readRangeValues(self.active_sheet, f'{header_row}:{header_row}')
+            self._headers[key] = header_index(rows[0] if rows else [])
+        return self._headers[key]
+
+    def read_columns(self, names, header_row=1, rows=None, where=None, gap=10, render='FORMATTED_VALUE',
+                     as_dataframe=False):
+        """ Only the named columns of the current tab: {name: column}, one values:batchGet
+
+            columns = GoogleSheetTable.read_columns(['price', 'qty'], rows=slice(0, 1000))  # first 1000 data rows
+            frame = GoogleSheetTable.read_columns(['price', 'qty'], where=('status', lambda value: value == 'open'),
+                                                  as_dataframe=True)  # index — sheet row numbers
+
+            Names are found in the header_row (cached per tab until a write from this object; names as in
+            read_sheet_to_columns). rows — slice of data rows below the header. where=(name, predicate) reads
+            that column first, then only the row blocks where predicate(value) is true (blocks at most `gap`
+            rows apart are read as one). Empty cells are ''; rows end at the last filled row of the read columns
+            (of the key column with where), whatever the slice stop.
+        """
+        names = list(names)
+        wanted = names + ([where[0]] if where is not None else [])
+        index = self._header_index(header_row)
+        if any(name not in index for name in wanted):  # columns added since the header was read
+            index = self._header_index(header_row, refresh=True)
+        unknown = [name for name in wanted if name not in index]
+        if unknown:
+            raise KeyError(f"No columns {unknown} in row {header_row} of {self.active_sheet.title!r}")
+        title = self.active_sheet.title
+        first, last, positions = rows_bounds(rows, header_row)
+        cols = [index[name] for name in names]
+        if last is not None and last < first:
+            selected, values = [], {}
+        elif where is None:
+            values = fetch_blocks(self.data_source, title, column_groups(cols), [(first, last)], render=render)
+            data_end = max((row for column in values.values() for row in column), default=first - 1)
+            end = min(last, data_end) if last is not None else data_end  # a stop past the data adds no rows
+            selected = list(range(first, end + 1))[positions]
+        else:
+            key_col = index[where[0]]
+            keys = fetch_blocks(self.data_source, title, [(key_col, key_col)], [(first, last)], render=render)[key_col]
+            end = min(last, max(keys, default=first - 1)) if last is not None else max(keys, default=first - 1)
+            selected = [row for row in list(range(first, end + 1))[positions] if where[1](keys.get(row, ''))]
+            other = [col for col in cols if col != key_col]
+            values = fetch_blocks(self.data_source, title, column_groups(other), row_blocks(selected, gap),
+                                  render=render) if other and selected else {}
+            values[key_col] = keys
+        result = {name: [values[index[name]].get(row, '') for row in selected] for name in names}
+        if as_dataframe:
+            return pd.DataFrame(result, columns=names, index=pd.Index(selected, name='row'))
+        return result
+
+    def iter_rows(self, chunk_rows=5000, width=None):
+        """ Yields the tab as lists of at most chunk_rows rows (bypasses the cache, for very large tabs)
+
+            Rows have one fixed width, by default the tab's col_count (see iterRows).
+        """
+        return self.data_source.iterRows(self.active_sheet, chunk_rows=chunk_rows, width=width)
+
+    def iter_dataframes(self, chunk_rows=5000, width=None):
+        """ Yields the tab as DataFrames of at most chunk_rows rows, index continues across chunks """
+        start = 0
+        for chunk in self.iter_rows(chunk_rows=chunk_rows, width=width):
+            yield pd.DataFrame(chunk, index=pd.RangeIndex(start, start + len(chunk)))
+            start += len(chunk)
+
+    def save_to_csv(self, filename='googleSheet', chunk_rows=5000, compress=False, width=None):
+        """ Streams the current tab to a rectangular CSV file (gzip with compress=True) """
+        return self.data_source.saveWorksheetToCSV(self.active_sheet, filename=filename,
+                                                   chunk_rows=chunk_rows, compress=compress, width=width)
+
+    def read_many(self, specs, as_dataframe=True):
+        """ Reads many tabs / ranges of this file in one values:batchGet (no tab switching)
+
+            frames = GoogleSheetTable.read_many(['Sales', "'Costs'!A1:D20", ('Plan', 'B2:F40')])
+            frames['Sales']  # DataFrame, or list of rows with as_dataframe=False
+        """
+        return read_specs(self.data_source, self.sheetID, specs, cache=self.cache, as_dataframe=as_dataframe)
+
     def read_sheet_to_list(self, corner=None, width=None, heigh=None, range=None):
         list_of_lists = self.get_all_values()
         # print(dataframe.head(n=10)) # DEBUG * DEBUG * DEBUG
         return list_of_lists
 
-    def read_sheet_to_dict(self, corner=None, width=None, heigh=None, range=None):
+    def read_sheet_to_dict(self, corner=None, width=None, heigh=None, range=None, typed=False, dtypes=None):
+            """ {header: column}, typed=True — NumPy arrays of unformatted values (see read_sheet_to_columns) """
+            if typed:
+                return self.read_sheet_to_columns(range_a1=range, dtypes=dtypes)
             dictionary = {}
-            list_of_lists = self.get_all_values()
+            list_of_lists = self._all_values()  # the dict gets new column lists
             # Parse lists to dict
             try:
                 keys = list_of_lists[0]
@@ -448,6 +765,138 @@ class GoogleSheet(object):
         update_result = self.data_source.update_range_by_corner(self.active_sheet, corner=corner, data=data)
         return update_result
 
+    def _forget_version(self, tab=None, rect=None):
+        """ After a write to the tab (rect, None — anywhere): the next snapshot read asks Drive for the version
+            again, headers are read again, sync_dataframe grids under the write are compared with the sheet again
+        """
+        self._headers.clear()
+        if self.snapshot_store is not None:
+            self.snapshot_store.forget_version(self.sheetID)
+        properties = self.data_source.index.by_title(tab) if tab else {'sheetId': self.active_sheet.id}
+        sheet_id = properties.get('sheetId', 0) if properties else None
+        for key, grid in list(self._snapshots.items()):
+            sheet, row, col = key
+            if sheet == sheet_id and (rect is None or
+                                      overlaps(rect, (row, col, row + max(grid.shape[0], 1) - 1,
+                                                      col + max(grid.shape[1], 1) - 1))):
+                self._snapshots.pop(key, None)
+
+    def write_dataframe(self, dataframe, corner='A1', header=True, chunk_bytes=2 * 1024 * 1024, max_parallel=4,
+                        retries=2):
+        """ Uploads a large DataFrame in row blocks of at most chunk_bytes (JSON), max_parallel blocks at a time
+
+            report = GoogleSheetTable.write_dataframe(big_df, corner='A1', chunk_bytes=1024 * 1024, max_parallel=4)
+            print(report)  # {'rows': 200001, 'blocks': 14, 'requests': 14, 'failed_blocks': [], 'rows_per_second': ...}
+
+            The tab is grown first if the frame does not fit. Blocks that still fail after the
+            rate limiter retries are sent again alone, up to `retries` times.
+        """
+        if self.data_source.batch is not None:
+            self.data_source.batch.flush()  # queued writes go first
+        row, col, *_ = parse_range(corner)
+        rows = frame_to_rows(dataframe, header=header)
+        writer = DataFrameWriter(self.data_source, chunk_bytes=chunk_bytes, max_parallel=max_parallel, retries=retries)
+        report = writer.write(self.active_sheet, rows, row=row, col=col)
+        if self.cache is not None and rows:
+            self.cache.invalidate(self.sheetID, self.active_sheet.title,
+                                  (row, col, row + len(rows) - 1, col + max(len(line) for line in rows) - 1))
+        self._forget_version(rect=(row, col, row + len(rows) - 1, col + max(len(line) for line in rows) - 1)
+                             if rows else None)  # sync_dataframe grids there must diff against the sheet again
+        logger.info(f"Wrote {report['rows']} rows in {report['blocks']} blocks, {report['rows_per_second']} rows/s")
+        return report
+
+    def sync_dataframe(self, dataframe, corner='A1', header=True, full=False, gap=2, clear_extent=None):
+        """ Writes only the cells that changed since the last sync of this tab / corner, in one batched request
+
+            report = GoogleSheetTable.sync_dataframe(report_df, corner='A1')
+            print(report)  # {'changed_cells': 12, 'rectangles': 3, 'cells_saved': 98710, 'bytes_saved': ..., ...}
+
+            The first sync compares with the values on the sheet under the frame, later ones with the last synced
+            frame; cells left over by a shrunk frame are emptied. Nothing outside the frame is touched on the first
+            sync — clear_extent=(rows, cols) also empties that area from the corner (a larger frame of an earlier run).
+            full=True rewrites the whole range.
+        """
+        row, col, *_ = parse_range(corner)
+        key = (self.active_sheet.id, row, col)
+        new = frame_to_grid(dataframe, header=header)
+        old = self._snapshots.get(key)
+        if old is None:  # the frame's own rectangle (and clear_extent) only, cells next to it are not ours
+            extent_rows, extent_cols = clear_extent or (0, 0)
+            height, width = max(new.shape[0], extent_rows), max(new.shape[1], extent_cols)
+            rows = self._read_range((row, col, row + height - 1, col + width - 1)) if height and width else []
+            old = np.array(rows, dtype=object).reshape(len(rows), width)
+        height, width = max(old.shape[0], new.shape[0]), max(old.shape[1], new.shape[1])
+        report = {'changed_cells': 0, 'rectangles': 0, 'cells_sent': 0, 'cells_full': height * width,
+                  'bytes_sent': 0, 'bytes_full': 0, 'requests': 0}
+        if not height or not width:
+            return report
+        old, new_padded = pad_grid(old, height, width), pad_grid(new, height, width)
+        if full:
+            rects, report['changed_cells'] = [(0, 0, height - 1, width - 1)], int((old != new_padded).sum())
+        else:
+            rects, report['changed_cells'] = changed_rectangles(old, new_padded, gap=gap)
+        title = self.active_sheet.title
+        blocks = [((row + r1, col + c1, row + r2, col + c2), new_padded[r1:r2 + 1, c1:c2 + 1].tolist())
+                  for r1, c1, r2, c2 in rects]
+        data = [{'range': f"{quote_title(title)}!{range_to_a1(rect)}", 'values': values} for rect, values in blocks]
+        report['rectangles'] = len(data)
+        report['cells_sent'] = sum((r2 - r1 + 1) * (c2 - c1 + 1) for r1, c1, r2, c2 in rects)
+        report['bytes_sent'] = len(json.dumps(data).encode('utf-8'))
+        report['bytes_full'] = len(json.dumps(new_padded.tolist()).encode('utf-8')) + len(title) + 20
+        if data:
+            self.data_source.ensureGridSize(self.active_sheet, row + new.shape[0] - 1, col + new.shape[1] - 1)
+            if self.data_source.batch is not None:  # goes with the other queued writes
+                for rect, values in blocks:
+                    self.data_source.batch.queue_update(self.active_sheet, corner=range_to_a1(rect).split(':')[0],
+                                                        data=values)
+            else:
+                self.data_source.api_call(self.data_source.wks.values_batch_update,
+                                          body={'valueInputOption': 'USER_ENTERED', 'data': data})
+                report['requests'] = 1
+                if self.cache is not None:
+                    for rect, _ in blocks:
+                        self.cache.invalidate(self.sheetID, title, rect)
+        self._forget_version(rect=(row, col, row + height - 1, col + width - 1))  # other grids under this one
+        self._snapshots[key] = new
+        report['cells_saved'] = report['cells_full'] - report['cells_sent']
+        report['bytes_saved'] = max(0, report['bytes_full'] - report['bytes_sent'])  # small diffs cost JSON overhead
+        logger.info(f"Synced {title}!{corner}: {report}")
+        return report
+
+    def apply_colors(self, mask, corner='A1', clear=False, number_format=None):
+        """ Colors cells from a mask in one spreadsheets.batchUpdate, equal colors merged into rectangles
+
+            mask = df['status'].map({'ok': '#b7e1cd', 'late': (244, 199, 195)}).to_frame()  # None — leave as is
+            report = GoogleSheetTable.apply_colors(mask, corner='D2')
+            print(report)  # {'cells': 10000, 'colors': 2, 'rectangles': 37, 'requests': 1}
+
+            Colors: '#RRGGBB', (r, g, b) in 0..1 or 0..255, {'red': .., 'green': .., 'blue': ..}.
+            clear=True — cells without a color lose their background, number_format — pattern ('0.00')
+            or NumberFormat dict set on the whole mask area.
+        """
+        if self.data_source.batch is not None:
+            self.data_source.batch.flush()  # queued formats go first
+        row, col, *_ = parse_range(corner)
+        grid = mask_to_grid(mask)
+        rects = color_rectangles(grid, clear=clear)
+        requests = repeat_cell_requests(self.active_sheet.id, rects, row=row, col=col)
+        height, width = len(grid), max((len(line) for line in grid), default=0)
+        if number_format is not None and height and width:
+            if isinstance(number_format, str):
+                number_format = {'type': 'NUMBER', 'pattern': number_format}
+            requests.append({'repeatCell': {
+                'range': grid_range(self.active_sheet.id, (row, col, row + height - 1, col + width - 1)),
+                'cell': {'userEnteredFormat': {'numberFormat': number_format}},
+                'fields': 'userEnteredFormat.numberFormat'}})
+        report = {'cells': sum(len(line) for line in grid), 'colors': len([color for color in rects if color != CLEAR]),
+                  'rectangles': sum(len(found) for found in rects.values()), 'requests': 0}
+        if requests:
+            self.data_source.ensureGridSize(self.active_sheet, row + height - 1, col + width - 1)
+            self.data_source.api_call(self.data_source.wks.batch_update, {'requests': requests})
+            report['requests'] = 1
+        logger.info(f"Colored {self.active_sheet.title}!{corner}: {report}")
+        return report
+
     def updateRangeColor(self, column1='B', line1=2, column2='B', line2=2, red=0.2, green=0.8, blue=0.2):
         """ Function to change background color """
         update_result = self.data_source.updateRangeColor(self.active_sheet, 
@@ -473,7 +922,8 @@ def main():
 # ————————————————————————————————————————————————————————————————————————————#
 # #############################################################################
 if __name__ == '__main__':
-    logger.info('——————————— -  BEGIN  - ————————————')  # will not be logged in API mode
+    enable_logging()
+    logger.info('——————————— -  BEGIN  - ————————————')
     
     # ——— parse command-line arguments
     parser = argparse.ArgumentParser(description='Google table handler')
@@ -0,0 +1,53 @@
+# import libraries
+import logging
+import importlib
+
+
+class LazyModule(object):
+    """ Module that is imported on first attribute access
+
+    pd = LazyModule('pandas')  # costs nothing at import time
+    pd.DataFrame(rows)  # pandas is imported here
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+    def __repr__(self):
+        state = 'loaded' if self._module is not None else 'not loaded'
+        return f"<LazyModule '{self._name}' ({state})>"
+
+
+def enable_logging(filename=None, level=logging.INFO, file_level=logging.DEBUG):
+    """ Opt-in logging of the package: console at `level`, and a file at `file_level` if filename given
+
+        import agg_spreads
+        agg_spreads.enable_logging('agg_spreads.log')
+
+    Calling it again replaces the handlers of the last call (no line is logged twice).
+    """
+    formatter = logging.Formatter(fmt='%(asctime)s: /%(name)s/ %(levelname)s: %(message)s',
+                                  datefmt='%m/%d/%Y %I:%M:%S %p')
+    logger = logging.getLogger('agg_spreads')
+    logger.setLevel(min(level, file_level) if filename else level)
+    for handler in [h for h in logger.handlers if getattr(h, '_agg_spreads', False)]:
+        logger.removeHandler(handler)
+        handler.close()
+    console = logging.StreamHandler()
+    console.setLevel(level)
+    console.setFormatter(formatter)
+    console._agg_spreads = True
+    logger.addHandler(console)
+    if filename:
+        log_file = logging.FileHandler(filename)
+        log_file.setLevel(file_level)
+        log_file.setFormatter(formatter)
+        log_file._agg_spreads = True
+        logger.addHandler(log_file)
+    return logger
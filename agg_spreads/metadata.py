@@ -0,0 +1,116 @@
+# import libraries
+import copy
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# the narrow mask of spreadsheets.get — only what is needed to open tabs and know their sizes
+METADATA_FIELDS = ('spreadsheetId,properties(title,locale,timeZone),'
+                   'sheets.properties(sheetId,title,index,sheetType,hidden,'
+                   'gridProperties(rowCount,columnCount,frozenRowCount,frozenColumnCount))')
+
+
+# #############################################################################
+# ####### ———————- SPREADSHEET METADATA INDEX -——————— #######################
+# #############################################################################
+class SheetIndex(object):
+    """ Titles, ids, indexes and grid sizes of every tab, loaded by one spreadsheets.get
+
+    Kept up to date from the replies of add / duplicate / rename requests, so tab switching
+    and sizes are served locally. Properties are the API `SheetProperties` dicts.
+
+    How to call:
+    index = SheetIndex(client.fetch_sheet_metadata(file_id, params={'fields': METADATA_FIELDS}))
+    index.titles()  # ['Sheet1', 'Sales']
+    index.by_title('Sales')  # {'sheetId': 123, 'title': 'Sales', 'index': 1, 'gridProperties': {...}}
+    """
+
+    def __init__(self, metadata):
+        self._lock = threading.RLock()
+        self.load(metadata)
+
+    def load(self, metadata):
+        """ (Re)loads the whole index from a spreadsheets.get reply """
+        with self._lock:
+            self.spreadsheet_id = metadata.get('spreadsheetId')
+            self.properties = dict(metadata.get('properties', {}))
+            self._sheets = [dict(sheet['properties']) for sheet in metadata.get('sheets', [])]
+            self._sort()
+
+    def _sort(self):
+        self._sheets.sort(key=lambda sheet: sheet.get('index', 0))
+
+    @property
+    def title(self):
+        return self.properties.get('title')
+
+    # ——————————————————————————— LOOKUP ———————————————————————————
+    def titles(self):
+        with self._lock:
+            return [sheet['title'] for sheet in self._sheets]
+
+    def sheets(self):
+        """ Copies of every tab properties, in tab order """
+        with self._lock:
+            return [copy.deepcopy(sheet) for sheet in self._sheets]
+
+    def by_title(self, title):
+        return self._find(lambda sheet: sheet['title'] == title)
+
+    def by_id(self, sheet_id):
+        return self._find(lambda sheet: sheet.get('sheetId', 0) == int(sheet_id))
+
+    def by_index(self, index):
+        with self._lock:
+            try:
+                return copy.deepcopy(self._sheets[index])
+            except IndexError:
+                return None
+
+    def _find(self, match):
+        with self._lock:
+            for sheet in self._sheets:
+                if match(sheet):
+                    return copy.deepcopy(sheet)
+        return None
+
+    # ——————————————————————————— INCREMENTAL UPDATES ———————————————————————————
+    def add(self, properties):
+        """ A tab from an addSheet / duplicateSheet reply, tabs after it move one index right """
+        properties = dict(properties)
+        with self._lock:
+            self._sheets = [sheet for sheet in self._sheets if sheet.get('sheetId') != properties.get('sheetId')]
+            position = properties.setdefault('index', len(self._sheets))
+            for sheet in self._sheets:
+                if sheet.get('index', 0) >= position:
+                    sheet['index'] = sheet.get('index', 0) + 1
+            self._sheets.append(properties)
+            self._sort()
+
+    def remove(self, sheet_id):
+        with self._lock:
+            removed = [sheet for sheet in self._sheets if sheet.get('sheetId') == sheet_id]
+            self._sheets = [sheet for sheet in self._sheets if sheet.get('sheetId') != sheet_id]
+            for gone in removed:
+                for sheet in self._sheets:
+                    if sheet.get('index', 0) > gone.get('index', 0):
+                        sheet['index'] -= 1
+
+    def rename(self, sheet_id, title):
+        self._update(sheet_id, lambda sheet: sheet.update(title=title))
+
+    def resize(self, sheet_id, rows=None, cols=None):
+        def apply(sheet):
+            grid = sheet.setdefault('gridProperties', {})
+            if rows is not None:
+                grid['rowCount'] = rows
+            if cols is not None:
+                grid['columnCount'] = cols
+        self._update(sheet_id, apply)
+
+    def _update(self, sheet_id, change):
+        with self._lock:
+            for sheet in self._sheets:
+                if sheet.get('sheetId') == sheet_id:
+                    change(sheet)
@@ -0,0 +1,262 @@
+# import libraries
+import json
+import time
+import bisect
+import logging
+import threading
+
+from .ranges import split_title, parse_range
+from .throttle import error_status
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)  # seconds
+READ_OPERATIONS = {'get_all_values', 'range', 'values_get', 'values_batch_get', 'fetch_sheet_metadata',
+                   'get', 'list', 'export'}  # the rest counts against the write quota
+
+_current = threading.local()  # span of the call running in this thread, for the session byte hook
+
+
+# #############################################################################
+# ####### ———————- PER-CALL METRICS AND TRACING HOOKS -——————— ###############
+# #############################################################################
+class Histogram(object):
+    """ Fixed-bucket latency histogram (seconds), percentiles are bucket upper bounds """
+
+    def __init__(self, bounds=LATENCY_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # the last one is +inf
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(self.bounds, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, share):
+        if not self.count:
+            return 0.0
+        rank, seen = share * self.count, 0
+        for bound, count in zip(self.bounds + (self.max,), self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def snapshot(self):
+        return {'count': self.count, 'mean': round(self.total / self.count, 4) if self.count else 0.0,
+                'p50': round(self.percentile(0.5), 4), 'p95': round(self.percentile(0.95), 4),
+                'p99': round(self.percentile(0.99), 4),
+                'max': round(self.max, 4),
+                'buckets': {('+inf' if i == len(self.bounds) else str(self.bounds[i])): count
+                            for i, count in enumerate(self.counts) if count}}
+
+
+def describe(func, args, kwargs):
+    """ (operation, tab, range or None, bytes out) of a gspread / googleapiclient call """
+    owner = getattr(func, '__self__', None)
+    method_id = getattr(owner, 'methodId', None)  # googleapiclient HttpRequest.execute
+    if method_id:
+        body = getattr(owner, 'body', None)
+        return method_id, None, None, len(body or '')
+    operation = getattr(func, '__name__', type(func).__name__)
+    tab = getattr(owner, 'title', None) if hasattr(owner, 'spreadsheet') else None  # a gspread Worksheet
+    range_a1 = next((arg for arg in args if isinstance(arg, str) and ('!' in arg or ':' in arg)), None)
+    if range_a1 and '!' in range_a1:
+        tab = split_title(range_a1)[0]
+    body = kwargs.get('body')
+    return operation, tab, range_a1, len(json.dumps(body, default=str)) if body is not None else 0
+
+
+def count_cells(result, range_a1=None):
+    """ Cells in a reply (values / valueRanges / list of rows), or in the range written """
+    if isinstance(result, dict):
+        if 'values' in result:
+            return sum(len(row) for row in result['values'])
+        if 'valueRanges' in result:
+            return sum(count_cells(item) for item in result['valueRanges'])
+        for key in ('updatedCells', 'totalUpdatedCells'):
+            if key in result:
+                return result[key]
+        return 0
+    if isinstance(result, list) and result and isinstance(result[0], list):
+        return sum(len(row) for row in result)
+    if range_a1:
+        try:
+            row1, col1, row2, col2 = parse_range(split_title(range_a1)[1])
+            return (row2 - row1 + 1) * (col2 - col1 + 1)
+        except Exception:
+            return 0
+    return 0
+
+
+def _count_response_bytes(response, *args, **kwargs):
+    """ requests response hook: bytes of the reply and of the request to the span of this thread """
+    span = getattr(_current, 'span', None)
+    if span is not None:
+        span['bytes_out'] += len(response.request.body or b'')
+        span['bytes_in'] += len(response.content or b'')
+    return response
+
+
+class NullMetrics(object):
+    """ Default: nothing is measured, api_call goes straight to the rate limiter """
+
+    enabled = False
+
+    def watch_session(self, client):
+        pass
+
+    def measure(self, limiter, func, args, kwargs, user=None, spreadsheet=None):
+        return limiter.call(func, *args, user=user, **kwargs)
+
+    def add_hook(self, hook):
+        raise ValueError("NullMetrics keeps nothing, create a Metrics() and pass it (or Metrics.set_shared)")
+
+    def stats(self):
+        return {}
+
+    def reset(self):
+        pass
+
+
+NULL_METRICS = NullMetrics()
+
+
+class Metrics(object):
+    """ Latency histograms, call / retry / error counters, bytes, cells and quota units per operation
+
+    Every request of GoogleSheetsObjects / GoogleSheet becomes a span dict: operation, spreadsheet, tab,
+    range, cells, status, attempts, started (epoch), seconds, bytes_in, bytes_out, quota ('read' / 'write').
+    Hooks get each finished span (e.g. to forward it to a tracer). Off by default (NullMetrics).
+
+    How to call:
+    metrics = Metrics()  # or Metrics.set_shared(Metrics()) for every object created afterwards
+    GoogleSheetTable = GoogleSheet(keyfile='<API key file.json>', sheetID='<ID>', metrics=metrics)
+    metrics.add_hook(lambda span: tracer.record(span['operation'], span['started'], span['seconds'], span))
+    print(metrics.stats())
+    """
+
+    enabled = True
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, bounds=LATENCY_BUCKETS):
+        self.bounds = bounds
+        self._hooks = []
+        self._lock = threading.Lock()
+        self.reset()
+
+    @classmethod
+    def shared(cls):
+        """ Process-wide metrics used when GoogleSheetsObjects gets none (NullMetrics until set) """
+        return cls._shared or NULL_METRICS
+
+    @classmethod
+    def set_shared(cls, metrics):
+        with cls._shared_lock:
+            cls._shared = metrics
+
+    def reset(self):
+        with self._lock:
+            self.latency = Histogram(self.bounds)
+            self.operations = {}  # operation -> {'latency': Histogram, counters...}
+            self.counters = {'calls': 0, 'requests': 0, 'retries': 0, 'errors': 0, 'bytes_in': 0, 'bytes_out': 0,
+                             'cells': 0, 'read_units': 0, 'write_units': 0}
+            self.statuses = {}
+
+    # ——————————————————————————— HOOKS ———————————————————————————
+    def add_hook(self, hook):
+        """ hook(span) is called after every request, exceptions in hooks are logged and ignored """
+        with self._lock:
+            self._hooks.append(hook)
+        return hook
+
+    def remove_hook(self, hook):
+        with self._lock:
+            self._hooks.remove(hook)
+
+    def watch_session(self, client):
+        """ Counts exact request / reply bytes of a gspread client (requests session hook, once per session) """
+        session = getattr(getattr(client, 'http_client', client), 'session', None)  # gspread 6 / gspread 5
+        if session is None or getattr(session, 'hooks', None) is None:
+            return
+        hooks = session.hooks.setdefault('response', [])
+        if _count_response_bytes not in hooks:
+            hooks.append(_count_response_bytes)
+
+    # ——————————————————————————— MEASURING ———————————————————————————
+    def measure(self, limiter, func, args, kwargs, user=None, spreadsheet=None):
+        """ limiter.call(func, *args, **kwargs) recorded as one span """
+        operation, tab, range_a1, bytes_out = describe(func, args, kwargs)
+        span = {'operation': operation, 'spreadsheet': spreadsheet, 'tab': tab, 'range': range_a1,
+                'cells': 0, 'status': None, 'attempts': 0, 'started': time.time(), 'seconds': 0.0,
+                'bytes_in': 0, 'bytes_out': 0, 'request_bytes': bytes_out,
+                'quota': 'read' if operation.rsplit('.', 1)[-1] in READ_OPERATIONS else 'write', 'error': None}
+
+        def attempt(*a, **kw):
+            span['attempts'] += 1
+            return func(*a, **kw)
+
+        previous = getattr(_current, 'span', None)
+        _current.span = span
+        started = time.perf_counter()
+        try:
+            result = limiter.call(attempt, *args, user=user, **kwargs)
+            span['status'] = 200
+            span['cells'] = count_cells(result, range_a1)
+            if not span['bytes_in'] and '.' in operation and isinstance(result, dict):
+                span['bytes_in'] = len(json.dumps(result))  # Drive reply (httplib2 has no hook), estimated
+            return result
+        except Exception as e:
+            span['status'] = error_status(e)[0] or type(e).__name__
+            span['error'] = str(e)[:200]
+            raise
+        finally:
+            span['seconds'] = time.perf_counter() - started
+            request_bytes = span.pop('request_bytes')
+            if not span['bytes_out']:
+                span['bytes_out'] = request_bytes * span['attempts']  # no session hook, estimated
+            _current.span = previous
+            self._record(span)
+
+    def _record(self, span):
+        with self._lock:
+            failed = span['status'] != 200
+            retries = max(0, span['attempts'] - 1)
+            entry = self.operations.get(span['operation'])
+            if entry is None:
+                entry = self.operations[span['operation']] = {
+                    'latency': Histogram(self.bounds), 'calls': 0, 'requests': 0, 'retries': 0, 'errors': 0,
+                    'bytes_in': 0, 'bytes_out': 0, 'cells': 0}
+            entry['latency'].observe(span['seconds'])
+            self.latency.observe(span['seconds'])
+            for counters in (entry, self.counters):
+                counters['calls'] += 1
+                counters['requests'] += span['attempts']
+                counters['retries'] += retries
+                counters['errors'] += failed
+                counters['bytes_in'] += span['bytes_in']
+                counters['bytes_out'] += span['bytes_out']
+                counters['cells'] += span['cells']
+            self.counters[f"{span['quota']}_units"] += span['attempts']  # every attempt uses a quota unit
+            self.statuses[span['status']] = self.statuses.get(span['status'], 0) + 1
+            hooks = list(self._hooks)
+        for hook in hooks:
+            try:
+                hook(span)
+            except Exception as e:
+                logger.error(f"{e}")
+
+    def stats(self):
+        """ Snapshot: totals, latency, statuses and per operation numbers """
+        with self._lock:
+            result = dict(self.counters)
+            result['latency'] = self.latency.snapshot()
+            result['statuses'] = dict(self.statuses)
+            result['operations'] = {name: dict(entry, latency=entry['latency'].snapshot())
+                                    for name, entry in self.operations.items()}
+            return result
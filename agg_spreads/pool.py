@@ -0,0 +1,168 @@
+# import libraries
+import os
+import logging
+import datetime
+import threading
+import weakref
+
+logger = logging.getLogger(__name__)
+
+SCOPE = ['https://spreadsheets.google.com/feeds', 'https://www.googleapis.com/auth/drive']
+
+
+# #############################################################################
+# ####### ———————- CREDENTIALS / CLIENT / DRIVE POOL -——————— ################
+# #############################################################################
+class ClientPool(object):
+    """ Reuses credentials, authorized gspread clients and Drive services per keyfile, thread-safe
+
+    The keyfile is parsed and authorized once, the access token is refreshed `refresh_ahead`
+    seconds before it expires. Drive services are kept one per thread (httplib2 is not thread-safe),
+    the ones of finished threads are closed when the next service is built.
+
+    How to call:
+    with ClientPool() as pool:  # or ClientPool.shared(), used by GoogleSheetsObjects by default
+        GoogleSheetTable = GoogleSheet(keyfile='<API key file.json>', sheetID='<ID>', pool=pool)
+        print(pool.stats())
+    """
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, refresh_ahead=300):
+        self.refresh_ahead = refresh_ahead  # seconds
+        self._entries = {}  # keyfile -> {'creds', 'client', 'drive' (thread local), 'lock'}
+        self._lock = threading.Lock()
+        self.counters = {'credentials_built': 0, 'clients_built': 0, 'drives_built': 0, 'drives_closed': 0,
+                         'reuses': 0, 'token_refreshes': 0}
+
+    @classmethod
+    def shared(cls):
+        """ Process-wide pool used when GoogleSheetsObjects gets none """
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _entry(self, keyfile):
+        keyfile = os.path.abspath(keyfile)
+        with self._lock:
+            if keyfile not in self._entries:
+                self._entries[keyfile] = {'keyfile': keyfile, 'creds': None, 'client': None,
+                                          'drive': threading.local(), 'drives': {}, 'lock': threading.RLock()}
+            return self._entries[keyfile]
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    # ——————————————————————————— RESOURCES ———————————————————————————
+    def credentials(self, keyfile):
+        """ ServiceAccountCredentials of the keyfile, token refreshed ahead of expiry """
+        return self._credentials(self._entry(keyfile), count=True)
+
+    def _credentials(self, entry, count=False):
+        with entry['lock']:
+            if entry['creds'] is None:
+                from oauth2client.service_account import ServiceAccountCredentials
+                entry['creds'] = ServiceAccountCredentials.from_json_keyfile_name(entry['keyfile'], SCOPE)
+                self._count('credentials_built')
+            else:
+                if count:
+                    self._count('reuses')
+                self._refresh_if_expiring(entry['creds'])
+            return entry['creds']
+
+    def client(self, keyfile):
+        """ Authorized gspread client of the keyfile """
+        entry = self._entry(keyfile)
+        creds = self._credentials(entry)
+        with entry['lock']:
+            if entry['client'] is None:
+                import gspread
+                entry['client'] = gspread.authorize(creds)
+                self._count('clients_built')
+            else:
+                self._count('reuses')
+            return entry['client']
+
+    def drive(self, keyfile):
+        """ Drive v2 service of the keyfile for the calling thread """
+        entry = self._entry(keyfile)
+        creds = self._credentials(entry)
+        service = getattr(entry['drive'], 'service', None)
+        if service is None:
+            from googleapiclient import discovery
+            # the Drive v2 discovery document ships with google-api-python-client, never fetched
+            service = discovery.build('drive', 'v2', credentials=creds, static_discovery=True, cache_discovery=False)
+            self._keep_drive(entry, service)
+        else:
+            self._count('reuses')
+        return service
+
+    def _keep_drive(self, entry, service):
+        """ Remembers the new service of the calling thread, closes the ones of threads that ended """
+        entry['drive'].service = service
+        with entry['lock']:
+            finished = [ref for ref, thread in [(ref, ref()) for ref in entry['drives']]
+                        if thread is None or not thread.is_alive()]  # short-lived threads / executors
+            finished = [entry['drives'].pop(ref) for ref in finished]
+            entry['drives'][weakref.ref(threading.current_thread())] = service
+        self._close_resources(finished)
+        with self._lock:
+            self.counters['drives_built'] += 1
+            self.counters['drives_closed'] += len(finished)
+
+    def _refresh_if_expiring(self, creds):
+        expiry = getattr(creds, 'token_expiry', None)  # naive UTC, None until the first token
+        if expiry is None:
+            return
+        if expiry - datetime.datetime.utcnow() < datetime.timedelta(seconds=self.refresh_ahead):
+            import httplib2
+            creds.refresh(httplib2.Http())
+            self._count('token_refreshes')
+
+    # ——————————————————————————— LIFETIME ———————————————————————————
+    def release(self, keyfile):
+        """ Closes and forgets everything built for the keyfile """
+        with self._lock:
+            entry = self._entries.pop(os.path.abspath(keyfile), None)
+        if entry is not None:
+            self._close_entry(entry)
+
+    def close(self):
+        """ Closes sessions of every client and Drive service """
+        with self._lock:
+            entries = list(self._entries.values())
+            self._entries.clear()
+        for entry in entries:
+            self._close_entry(entry)
+
+    @classmethod
+    def _close_entry(cls, entry):
+        client = entry['client']
+        session = getattr(getattr(client, 'http_client', client), 'session', None)  # gspread 6 / gspread 5
+        cls._close_resources([session] + list(entry['drives'].values()))
+
+    @staticmethod
+    def _close_resources(resources):
+        for resource in resources:
+            try:
+                if resource is not None:
+                    resource.close()
+            except Exception as e:
+                logger.error(f"{e}")
+
+    def stats(self):
+        """ How much was built and how much reused """
+        with self._lock:
+            result = dict(self.counters)
+            result['keyfiles'] = len(self._entries)
+            result['drives_open'] = sum(len(entry['drives']) for entry in self._entries.values())
+            return result
@@ -0,0 +1,78 @@
+# import libraries
+import logging
+
+from .columns import column_names
+from .ranges import index_to_column, quote_title
+
+logger = logging.getLogger(__name__)
+
+MAX_RANGES = 200  # ranges per values:batchGet (they go in the URL of a GET)
+
+
+# #############################################################################
+# ####### ———————- COLUMN PROJECTION AND ROW FILTER -——————— ##################
+# #############################################################################
+# Reads a few named columns of a wide tab: names -> columns from a cached header row,
+# only those columns (and only the matching row blocks) are fetched
+#
+# Row positions are 0-based data rows below the header row, like a DataFrame slice.
+
+
+def header_index(headers):
+    """ Header cells -> {name: 1-based column}, names as column_names gives them (empty -> letter, repeats .1) """
+    return {name: col for col, name in enumerate(column_names(headers), start=1)}
+
+
+def column_groups(cols):
+    """ Sorted 1-based columns -> runs of adjacent ones [(col1, col2)], each run is one range """
+    groups = []
+    for col in sorted(set(cols)):
+        if groups and col == groups[-1][1] + 1:
+            groups[-1] = (groups[-1][0], col)
+        else:
+            groups.append((col, col))
+    return groups
+
+
+def row_blocks(rows, gap=0):
+    """ Sorted sheet rows -> blocks [(row1, row2)], blocks at most `gap` rows apart are read as one """
+    blocks = []
+    for row in rows:
+        if blocks and row - blocks[-1][1] <= gap + 1:
+            blocks[-1] = (blocks[-1][0], row)
+        else:
+            blocks.append((row, row))
+    return blocks
+
+
+def rows_bounds(rows, header_row):
+    """ slice of data rows -> (first sheet row, last sheet row or None — to the end, slice of the rows read) """
+    rows = rows if rows is not None else slice(None)
+    if (rows.step or 1) < 1:
+        raise ValueError("rows: only a positive step is supported")
+    if (rows.start or 0) < 0 or (rows.stop or 0) < 0:  # counted from the end of the data, known after the read
+        return header_row + 1, None, rows
+    first = header_row + 1 + (rows.start or 0)
+    last = header_row + rows.stop if rows.stop is not None else None
+    return first, last, slice(None, None, rows.step)
+
+
+def block_ranges(title, groups, blocks):
+    """ A1 ranges of every column group x row block, block end None — to the end of the tab """
+    return [f"{quote_title(title)}!{index_to_column(col1)}{row1}:{index_to_column(col2)}{row2 or ''}"
+            for row1, row2 in blocks for col1, col2 in groups]
+
+
+def fetch_blocks(data_source, title, groups, blocks, render='FORMATTED_VALUE'):
+    """ {column: {sheet row: value}} of the groups x blocks, in values:batchGet calls of MAX_RANGES ranges """
+    ranges = block_ranges(title, groups, blocks)
+    values = {col: {} for col1, col2 in groups for col in range(col1, col2 + 1)}
+    replies = []
+    for start in range(0, len(ranges), MAX_RANGES):
+        replies.extend(data_source.readBatchValues(ranges[start:start + MAX_RANGES], render=render,
+                                                   major='COLUMNS'))
+    pieces = [(row1, col1, col2) for row1, _ in blocks for col1, col2 in groups]
+    for (row1, col1, col2), columns in zip(pieces, replies):
+        for col, column in zip(range(col1, col2 + 1), columns):  # the API trims empty cells / columns at the end
+            values[col].update(zip(range(row1, row1 + len(column)), column))
+    return values
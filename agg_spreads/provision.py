@@ -0,0 +1,149 @@
+# import libraries
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from .metadata import SheetIndex
+from .throttle import is_retryable, is_rejected
+
+logger = logging.getLogger(__name__)
+
+BATCH_LIMIT = 100  # requests per Drive batch call
+SPREADSHEET_MIME = 'application/vnd.google-apps.spreadsheet'
+
+
+# #############################################################################
+# ####### ———————- BULK PROVISIONING (Drive batch requests) -——————— #########
+# #############################################################################
+# Creates, shares and hands over many spreadsheets with Drive batch requests
+#
+# A spec is a dict: {'title': 'Client A', 'email': 'a@client.com', 'folder_id': '<folder>',
+# 'template_id': '<spreadsheet to copy>', 'duplicates': [('Template', 'January'), ...]}
+# — only title is required. With template_id the file is a files.copy of the template.
+
+
+def drive_batch(data_source, factories, retries=2, retry_if=is_retryable):
+    """ Sends {key: () -> HttpRequest} in Drive batch calls of BATCH_LIMIT, returns {key: (response, error)}
+
+        Items failing with an error retry_if accepts (default: 429, 5xx, rate limit 403) are sent again
+        in the next round. Non-idempotent requests (inserts, copies) use is_rejected: a 5xx may have created it.
+    """
+    service = data_source.pool.drive(data_source.keyfile)
+    results = {}
+    pending = list(factories)
+    for attempt in range(retries + 1):
+        for start in range(0, len(pending), BATCH_LIMIT):
+            chunk = pending[start:start + BATCH_LIMIT]
+
+            def callback(request_id, response, exception, chunk=chunk):
+                results[chunk[int(request_id)]] = (response, exception)
+
+            batch = service.new_batch_http_request(callback=callback)
+            for position, key in enumerate(chunk):
+                batch.add(factories[key](), request_id=str(position))
+            try:
+                data_source.api_call(batch.execute, retry_if=retry_if)
+            except Exception as e:  # the whole batch failed, every item of it did
+                logger.error(f"{e}")
+                results.update({key: (None, e) for key in chunk})
+        pending = [key for key in pending if results[key][1] is not None and retry_if(results[key][1])]
+        if not pending or attempt == retries:
+            break
+        time.sleep(data_source.limiter.backoff(attempt))
+    return results
+
+
+def _duplicate(data_source, file_id, duplicates):
+    """ Every duplicateSheet of one file in one batchUpdate, returns the new titles """
+    index = SheetIndex(data_source.fetchMetadata(file_id))
+    requests = []
+    for position, (source, new_title) in enumerate(duplicates):
+        properties = index.by_title(source)
+        if properties is None:
+            raise ValueError(f"No tab {source!r} to duplicate in {file_id}")
+        requests.append({'duplicateSheet': {'sourceSheetId': properties['sheetId'], 'newSheetName': new_title,
+                                            'insertSheetIndex': len(index.titles()) + position}})
+    spreadsheet = data_source._spreadsheet(file_id, index.properties)
+    data_source.api_call(spreadsheet.batch_update, {'requests': requests})
+    return [new_title for _, new_title in duplicates]
+
+
+def provision_many(keyfile, specs, max_workers=8, retries=2, limiter=None, pool=None, metrics=None):
+    """ Creates many spreadsheets: inserts, shares and owner changes go in Drive batches, no file is opened
+
+        results = provision_many('<API key file.json>', [{'title': 'Client A', 'email': 'a@client.com',
+                                                          'template_id': '<ID>', 'duplicates': [('Template', 'May')]}])
+        results[0]  # {'title': 'Client A', 'file_id': '...', 'url': '...', 'shared': True, 'owner_changed': True,
+                    #  'duplicated': ['May'], 'errors': [], 'ok': True}
+
+        Results follow the order of specs. A step that fails is in 'errors', later steps of that file are skipped,
+        other files go on. Tab duplication runs max_workers files in parallel, one batchUpdate per file.
+        Creates are sent again only when refused by quota (429): after a 5xx the file may exist already.
+        limiter / pool / metrics are passed to GoogleSheetsObjects (as for GoogleSheet).
+    """
+    from .google_handler import GoogleSheetsObjects
+    data_source = GoogleSheetsObjects(keyfile=keyfile, limiter=limiter, pool=pool, metrics=metrics)
+    drive = data_source.pool.drive(data_source.keyfile)
+    results = [{'title': spec['title'], 'file_id': None, 'url': None, 'shared': False, 'owner_changed': False,
+                'duplicated': [], 'errors': [], 'ok': False} for spec in specs]
+
+    def create(spec):
+        body = {'title': spec['title'], 'mimeType': SPREADSHEET_MIME,
+                'parents': [{'id': spec['folder_id']}] if spec.get('folder_id') else []}
+        if spec.get('template_id'):
+            return lambda: drive.files().copy(fileId=spec['template_id'], body=body)
+        return lambda: drive.files().insert(body=body)
+
+    created = drive_batch(data_source, {n: create(spec) for n, spec in enumerate(specs)}, retries=retries,
+                          retry_if=is_rejected)  # a 5xx may have created the file, sending again would duplicate it
+    owners = {}  # n -> permission id of the service account (the current owner)
+    for n, (response, error) in created.items():
+        if error is not None:
+            results[n]['errors'].append(f"create: {error}")
+            continue
+        results[n]['file_id'] = response['id']
+        results[n]['url'] = f"https://docs.google.com/spreadsheets/d/{response['id']}/edit?usp=drivesdk"
+        # owners[].permissionId is the real id, userPermission.id is the alias 'me'
+        owners[n] = next((owner.get('permissionId') for owner in response.get('owners', [])), None)
+        logger.info(f"🔗 CREATED: {results[n]['url']}")
+
+    with_email = [n for n, spec in enumerate(specs) if spec.get('email') and results[n]['file_id']]
+    shared = drive_batch(data_source, {
+        n: (lambda n=n: drive.permissions().insert(fileId=results[n]['file_id'],
+                                                   body=data_source.share_body(specs[n]['email'])))
+        for n in with_email}, retries=retries)
+    for n, (response, error) in shared.items():
+        results[n]['shared'] = error is None
+        if error is not None:
+            results[n]['errors'].append(f"share: {error}")
+
+    to_owner = [n for n in with_email if results[n]['shared']]
+    for n in [n for n in to_owner if not owners.get(n)]:
+        results[n]['errors'].append("owner: permission id of the current owner is unknown")
+    changed = drive_batch(data_source, {
+        n: (lambda n=n: drive.permissions().update(fileId=results[n]['file_id'], permissionId=owners[n],
+                                                   body=data_source.owner_body(specs[n]['email']),
+                                                   transferOwnership=True))
+        for n in to_owner if owners.get(n)}, retries=retries)
+    for n, (response, error) in changed.items():
+        results[n]['owner_changed'] = error is None
+        if error is not None:
+            results[n]['errors'].append(f"owner: {error}")
+
+    def duplicate(n):
+        try:
+            results[n]['duplicated'] = _duplicate(data_source, results[n]['file_id'], specs[n]['duplicates'])
+        except Exception as e:
+            logger.error(f"{results[n]['file_id']}: {e}")
+            results[n]['errors'].append(f"duplicate: {e}")
+
+    to_duplicate = [n for n, spec in enumerate(specs)
+                    if spec.get('duplicates') and results[n]['file_id'] and not results[n]['errors']]
+    if to_duplicate:
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(to_duplicate)))) as executor:
+            list(executor.map(duplicate, to_duplicate))
+
+    for result in results:
+        result['ok'] = not result['errors']
+    logger.info(f"Provisioned {sum(result['ok'] for result in results)}/{len(results)} spreadsheets")
+    return results
@@ -0,0 +1,161 @@
+# #############################################
+# ######## A1 NOTATION & GRID HELPERS #########
+# #############################################
+""" Small dependency-free helpers to convert A1 notation to grid coordinates and back
+    and to merge rectangles of cells.
+
+    All coordinates here are 1-based and inclusive, the same way they look in A1 notation:
+    'B3:D10' -> (3, 2, 10, 4) as (row1, col1, row2, col2)
+"""
+import re
+
+CELL_RE = re.compile(r'^\$?([A-Za-z]*)\$?(\d*)$')
+
+
+def column_to_index(letters):
+    """ 'A' -> 1, 'Z' -> 26, 'AA' -> 27, 'ZZZ' -> 18278 """
+    index = 0
+    for char in letters.upper():
+        if not 'A' <= char <= 'Z':
+            raise ValueError(f"Wrong column letters: `{letters}`")
+        index = index * 26 + (ord(char) - 64)
+    if index == 0:
+        raise ValueError("Empty column letters")
+    return index
+
+
+def index_to_column(index):
+    """ 1 -> 'A', 27 -> 'AA', 18278 -> 'ZZZ' """
+    if index < 1:
+        raise ValueError(f"Column index must be positive, got {index}")
+    letters = ''
+    while index:
+        index, rest = divmod(index - 1, 26)
+        letters = chr(65 + rest) + letters
+    return letters
+
+
+def a1_to_rowcol(cell):
+    """ 'B3' -> (3, 2) """
+    match = CELL_RE.match(cell.strip())
+    if not match or not match.group(1) or not match.group(2):
+        raise ValueError(f"Wrong cell in A1 notation: `{cell}`")
+    return int(match.group(2)), column_to_index(match.group(1))
+
+
+def rowcol_to_a1(row, col):
+    """ (3, 2) -> 'B3' """
+    return f"{index_to_column(col)}{int(row)}"
+
+
+def parse_range(range_a1):
+    """ 'A1:C3' -> (1, 1, 3, 3), a single cell 'B2' -> (2, 2, 2, 2) """
+    left, _, right = range_a1.partition(':')
+    row1, col1 = a1_to_rowcol(left)
+    row2, col2 = a1_to_rowcol(right) if right else (row1, col1)
+    return min(row1, row2), min(col1, col2), max(row1, row2), max(col1, col2)
+
+
+def range_to_a1(rect):
+    """ (1, 1, 3, 3) -> 'A1:C3' """
+    row1, col1, row2, col2 = rect
+    return f"{rowcol_to_a1(row1, col1)}:{rowcol_to_a1(row2, col2)}"
+
+
+def quote_title(title):
+    """ Sheet title ready to be a range prefix: My tab -> 'My tab' """
+    return "'{}'".format(title.replace("'", "''"))
+
+
+def split_title(range_a1):
+    """ "'My tab'!A1:B2" -> ('My tab', 'A1:B2'), no sheet title -> (None, 'A1:B2') """
+    if '!' not in range_a1:
+        return None, range_a1
+    title, _, cells = range_a1.rpartition('!')
+    if title.startswith("'") and title.endswith("'"):
+        title = title[1:-1].replace("''", "'")
+    return title, cells
+
+
+def grid_range(sheet_id, rect):
+    """ A1 rectangle to the API GridRange object (0-based, end exclusive) """
+    row1, col1, row2, col2 = rect
+    return {'sheetId': sheet_id,
+            'startRowIndex': row1 - 1, 'endRowIndex': row2,
+            'startColumnIndex': col1 - 1, 'endColumnIndex': col2}
+
+
+# ———————————————————————————— RECTANGLES ————————————————————————————
+def overlaps(a, b):
+    """ True if two rectangles share at least one cell """
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+
+def touches(a, b):
+    """ True if two rectangles overlap or lie edge to edge """
+    rows_meet = a[0] <= b[2] and b[0] <= a[2]
+    cols_meet = a[1] <= b[3] and b[1] <= a[3]
+    rows_near = a[0] <= b[2] + 1 and b[0] <= a[2] + 1
+    cols_near = a[1] <= b[3] + 1 and b[1] <= a[3] + 1
+    return (rows_meet and cols_near) or (cols_meet and rows_near)
+
+
+def bounding_box(rects):
+    rects = list(rects)
+    return (min(r[0] for r in rects), min(r[1] for r in rects),
+            max(r[2] for r in rects), max(r[3] for r in rects))
+
+
+def _union_is_rectangle(a, b):
+    """ True if a ∪ b is exactly their bounding box (so they can be swapped for it) """
+    if a[0] <= b[0] and a[1] <= b[1] and a[2] >= b[2] and a[3] >= b[3]:
+        return True  # b inside a
+    if b[0] <= a[0] and b[1] <= a[1] and b[2] >= a[2] and b[3] >= a[3]:
+        return True  # a inside b
+    if a[1] == b[1] and a[3] == b[3]:
+        return a[0] <= b[2] + 1 and b[0] <= a[2] + 1  # same columns, rows meet
+    if a[0] == b[0] and a[2] == b[2]:
+        return a[1] <= b[3] + 1 and b[1] <= a[3] + 1  # same rows, columns meet
+    return False
+
+
+def merge_rectangles(rects):
+    """ Merges rectangles whose union is a rectangle itself, never covers extra cells """
+    merged = sorted(set(rects))
+    changed = True
+    while changed:
+        changed = False
+        result = []
+        for rect in merged:
+            for i, other in enumerate(result):
+                if _union_is_rectangle(rect, other):
+                    result[i] = bounding_box((rect, other))
+                    changed = True
+                    break
+            else:
+                result.append(rect)
+        merged = sorted(result)
+    return merged
+
+
+def touching_groups(rects):
+    """ Splits rectangles into groups of (transitively) touching ones, returns lists of indexes """
+    parent = list(range(len(rects)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    order = sorted(range(len(rects)), key=lambda i: rects[i][0])
+    for n, i in enumerate(order):
+        for j in order[n + 1:]:
+            if rects[j][0] > rects[i][2] + 1:
+                break  # sorted by top row, nothing below can touch
+            if touches(rects[i], rects[j]):
+                parent[find(j)] = find(i)
+    groups = {}
+    for i in range(len(rects)):
+        groups.setdefault(find(i), []).append(i)
+    return [sorted(group) for group in groups.values()]
@@ -0,0 +1,275 @@
+# import libraries
+import os
+import io
+import json
+import mmap
+import time
+import struct
+import hashlib
+import logging
+import tempfile
+import threading
+import contextlib
+
+from .lazy import LazyModule
+
+np = LazyModule('numpy')
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'AGGSNAP1'
+HEADER = struct.Struct('<8sQ')  # magic, length of the JSON meta
+
+
+# #############################################################################
+# ####### ———————- ON-DISK SNAPSHOTS SHARED BY PROCESSES -——————— ############
+# #############################################################################
+@contextlib.contextmanager
+def file_lock(path):
+    """ Exclusive lock between processes (flock / msvcrt), blocks until it is free """
+    with open(path, 'a+b') as handle:
+        if fcntl is not None:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+        else:
+            handle.seek(0)
+            msvcrt.locking(handle.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+            else:
+                handle.seek(0)
+                msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def dump_grid(rows, meta):
+    """ Rows of strings -> snapshot bytes: header, JSON meta, int64 row starts, int64 cell offsets, UTF-8 cells """
+    cells = [str(value).encode('utf-8') for row in rows for value in row]
+    row_starts = np.zeros(len(rows) + 1, dtype='<i8')
+    np.cumsum([len(row) for row in rows], out=row_starts[1:])
+    offsets = np.zeros(len(cells) + 1, dtype='<i8')
+    np.cumsum([len(cell) for cell in cells], out=offsets[1:])
+    meta = dict(meta, rows=len(rows), cells=len(cells))
+    meta_bytes = json.dumps(meta).encode('utf-8')
+    meta_bytes += b' ' * (-(HEADER.size + len(meta_bytes)) % 8)  # arrays start 8-byte aligned
+    output = io.BytesIO()
+    output.write(HEADER.pack(MAGIC, len(meta_bytes)))
+    output.write(meta_bytes)
+    output.write(row_starts.tobytes())
+    output.write(offsets.tobytes())
+    output.write(b''.join(cells))
+    return output.getvalue()
+
+
+class Snapshot(object):
+    """ A memory-mapped snapshot file: arrays are views of the mapping (the OS shares its pages between
+    processes), cells are decoded only when asked for and nothing decoded is kept
+
+    How to call:
+    snapshot = store.read('<ID>', 'Sales')
+    snapshot.shape  # (rows, widest row)
+    snapshot.cell(0, 2), snapshot.row(10), snapshot.column(3)  # decodes just those cells
+    rows = snapshot.rows()  # every row as a new list of str
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as handle:
+            self.stat = os.fstat(handle.fileno())
+            self.buffer = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, meta_length = HEADER.unpack_from(self.buffer, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a snapshot")
+        self.meta = json.loads(self.buffer[HEADER.size:HEADER.size + meta_length])
+        start = HEADER.size + meta_length
+        self.row_starts = np.frombuffer(self.buffer, dtype='<i8', count=self.meta['rows'] + 1, offset=start)
+        start += self.row_starts.nbytes
+        self.offsets = np.frombuffer(self.buffer, dtype='<i8', count=self.meta['cells'] + 1, offset=start)
+        self.data_start = start + self.offsets.nbytes
+
+    def __len__(self):
+        return self.meta['rows']
+
+    @property
+    def shape(self):
+        return self.meta['rows'], int(np.diff(self.row_starts).max()) if self.meta['rows'] else 0
+
+    def _decode(self, cell):
+        start = self.data_start + int(self.offsets[cell])
+        return self.buffer[start:self.data_start + int(self.offsets[cell + 1])].decode('utf-8')
+
+    def cell(self, row, col):
+        """ 0-based cell, '' right of the end of its row """
+        cell = int(self.row_starts[row]) + col
+        return self._decode(cell) if cell < int(self.row_starts[row + 1]) else ''
+
+    def row(self, row):
+        return [self._decode(cell) for cell in range(int(self.row_starts[row]), int(self.row_starts[row + 1]))]
+
+    def column(self, col):
+        """ 0-based column of every row, '' where a row is shorter """
+        cells = self.row_starts[:-1] + col
+        inside = cells < self.row_starts[1:]
+        return [self._decode(int(cell)) if present else '' for cell, present in zip(cells, inside)]
+
+    def rows(self):
+        """ The grid back as new lists of str (decoded now, the caller owns them) """
+        data = self.buffer[self.data_start:self.data_start + int(self.offsets[-1])]
+        bounds = self.offsets.tolist()
+        cells = [data[a:b].decode('utf-8') for a, b in zip(bounds, bounds[1:])]
+        starts = self.row_starts.tolist()
+        return [cells[a:b] for a, b in zip(starts, starts[1:])]
+
+    def close(self):
+        self.row_starts = self.offsets = None  # views must go before the mapping closes
+        self.buffer.close()
+
+
+class SnapshotStore(object):
+    """ Whole-tab reads kept on disk, memory-mapped and shared by every process using the directory
+
+    Before a snapshot is used, Drive files.get(fields='version,modifiedDate') tells whether the file
+    changed (at most once per `check_every` seconds per process). A stale or missing snapshot is refetched
+    by one process under a file lock, the others wait and read what it wrote. A warm restart reads
+    without any Sheets values call.
+
+    How to call:
+    store = SnapshotStore('/var/cache/agg_spreads', check_every=30)  # the same directory in every worker
+    GoogleSheetTable = GoogleSheet(keyfile='<API key file.json>', sheetID='<ID>', snapshot_store=store)
+    df = GoogleSheetTable.read_sheet_to_dataframe()  # whole-tab reads go through the store
+    prices = store.read('<ID>', 'Sales').column(3)  # or straight from the mapping, one column decoded
+    print(store.stats())
+    """
+
+    def __init__(self, directory, check_every=0.0):
+        self.directory = directory
+        self.check_every = check_every  # seconds a Drive version check stays valid in this process
+        os.makedirs(directory, exist_ok=True)
+        self._loaded = {}  # path -> Snapshot (the mapping only, nothing decoded)
+        self._checked = {}  # file id -> (version, modifiedDate, checked at)
+        self._lock = threading.RLock()
+        self.counters = {'hits': 0, 'refreshes': 0, 'refreshed_elsewhere': 0, 'version_checks': 0, 'bytes_written': 0}
+
+    def _path(self, file_id, tab):
+        name = hashlib.sha1(tab.encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.directory, file_id, f'{name}.snap')
+
+    def _count(self, name, value=1):
+        with self._lock:
+            self.counters[name] += value
+
+    # ——————————————————————————— VERSIONS ———————————————————————————
+    def version(self, data_source, file_id):
+        """ (version, modifiedDate) of the file, from Drive or from a check younger than check_every """
+        with self._lock:
+            checked = self._checked.get(file_id)
+            if checked is not None and time.monotonic() - checked[2] < self.check_every:
+                return checked[:2]
+        version, modified = data_source.fileVersion(file_id)
+        self._count('version_checks')
+        with self._lock:
+            self._checked[file_id] = (version, modified, time.monotonic())
+        return version, modified
+
+    def forget_version(self, file_id):
+        """ The next read checks Drive again (after a write from this process) """
+        with self._lock:
+            self._checked.pop(file_id, None)
+
+    # ——————————————————————————— READ / WRITE ———————————————————————————
+    def read(self, file_id, tab, version=None):
+        """ The mapped Snapshot (of that version, if given) or None """
+        path = self._path(file_id, tab)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        with self._lock:
+            snapshot = self._loaded.get(path)
+            if snapshot is None or (snapshot.stat.st_ino, snapshot.stat.st_mtime_ns) != (stat.st_ino, stat.st_mtime_ns):
+                try:  # a replaced mapping is not closed, callers may still hold it — it goes with its last reference
+                    snapshot = self._loaded[path] = Snapshot(path)
+                except (OSError, ValueError) as e:
+                    logger.error(f"{e}")
+                    self._loaded.pop(path, None)
+                    return None
+        if version is not None and snapshot.meta.get('version') != version:
+            return None
+        return snapshot
+
+    def write(self, file_id, tab, rows, version=None, modified=None):
+        """ Saves rows atomically (temp file + rename, readers keep their old mapping), returns the path """
+        path = self._path(file_id, tab)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        content = dump_grid(rows, {'file_id': file_id, 'tab': tab, 'version': version, 'modifiedDate': modified,
+                                   'fetched_at': time.time()})
+        handle, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(handle, 'wb') as output:
+                output.write(content)
+            os.chmod(temp_path, 0o644)  # mkstemp makes it private, workers may run as other users
+            os.replace(temp_path, path)
+        except Exception:
+            with contextlib.suppress(OSError):
+                os.remove(temp_path)
+            raise
+        self._count('bytes_written', len(content))
+        return path
+
+    def fetch(self, data_source, file_id, tab, loader):
+        """ Mapped Snapshot of the tab: a current one, or loader() rows once across processes, saved and mapped """
+        try:
+            version, modified = self.version(data_source, file_id)
+        except Exception as e:  # Drive unavailable — a snapshot of any version beats nothing
+            logger.error(f"{e}")
+            snapshot = self.read(file_id, tab)
+            if snapshot is None:
+                raise
+            self._count('hits')
+            return snapshot
+        snapshot = self.read(file_id, tab, version)
+        if snapshot is not None:
+            self._count('hits')
+            return snapshot
+        path = self._path(file_id, tab)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with file_lock(path + '.lock'):
+            snapshot = self.read(file_id, tab, version)  # another process may have refetched while we waited
+            if snapshot is not None:
+                self._count('refreshed_elsewhere')
+                return snapshot
+            self.write(file_id, tab, loader(), version, modified)
+            self._count('refreshes')
+            return self.read(file_id, tab, version)
+
+    def invalidate(self, file_id, tab=None):
+        """ Removes snapshots of the file / tab """
+        self.forget_version(file_id)
+        folder = os.path.join(self.directory, file_id)
+        if tab is not None:
+            paths = [self._path(file_id, tab)]
+        else:
+            paths = [os.path.join(folder, name) for name in os.listdir(folder) if name.endswith('.snap')] \
+                if os.path.isdir(folder) else []
+        for path in paths:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(path)
+
+    def close(self):
+        with self._lock:
+            for snapshot in self._loaded.values():
+                snapshot.close()
+            self._loaded.clear()
+
+    def stats(self):
+        with self._lock:
+            result = dict(self.counters)
+            result['mapped'] = len(self._loaded)
+            result['mapped_bytes'] = sum(len(snapshot.buffer) for snapshot in self._loaded.values())
+            return result
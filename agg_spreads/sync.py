@@ -0,0 +1,60 @@
+# import libraries
+import logging
+
+from .lazy import LazyModule
+from .ranges import merge_rectangles
+
+np = LazyModule('numpy')
+
+logger = logging.getLogger(__name__)
+
+
+# #############################################################################
+# ####### ———————- DATAFRAME DIFF INTO CHANGED RECTANGLES -——————— ###########
+# #############################################################################
+# Cell-level diff of two string grids (numpy object arrays) grouped into rectangles to write
+#
+# Rectangles here are 0-based, inclusive, relative to the grid corner: (row1, col1, row2, col2).
+
+
+def frame_to_grid(dataframe, header=True):
+    """ DataFrame -> 2D object array of str as the sheet gets it ('' for NaN / None / NaT) """
+    values = dataframe.astype(object).where(dataframe.notna(), '').to_numpy(dtype=object)
+    grid = values.astype(str).astype(object)
+    if header:
+        grid = np.vstack([np.array([str(column) for column in dataframe.columns], dtype=object), grid]) \
+            if grid.size else np.array([[str(column) for column in dataframe.columns]], dtype=object)
+    return grid
+
+
+def pad_grid(grid, height, width):
+    """ The grid grown to height x width with '' (cells that must be emptied) """
+    result = np.full((height, width), '', dtype=object)
+    result[:grid.shape[0], :grid.shape[1]] = grid
+    return result
+
+
+def changed_rectangles(old, new, gap=2):
+    """ Rectangles covering every cell where old != new (both padded to one shape)
+
+        Runs of changed cells in a row are joined over gaps of up to `gap` unchanged cells,
+        equal runs on neighbouring rows are stacked, then rectangles are merged where the union is exact.
+    """
+    changed = old != new
+    rects = []
+    open_runs = {}  # (col1, col2) -> row1 of the rectangle growing down
+    for row in range(changed.shape[0]):
+        columns = np.flatnonzero(changed[row])
+        runs = []
+        if columns.size:
+            breaks = np.flatnonzero(np.diff(columns) > gap + 1)
+            starts = np.concatenate(([columns[0]], columns[breaks + 1]))
+            ends = np.concatenate((columns[breaks], [columns[-1]]))
+            runs = list(zip(starts.tolist(), ends.tolist()))
+        still_open = {}
+        for run in runs:
+            still_open[run] = open_runs.pop(run, row)
+        rects.extend((row1, run[0], row - 1, run[1]) for run, row1 in open_runs.items())
+        open_runs = still_open
+    rects.extend((row1, run[0], changed.shape[0] - 1, run[1]) for run, row1 in open_runs.items())
+    return merge_rectangles(rects), int(changed.sum())
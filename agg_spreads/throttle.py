@@ -0,0 +1,209 @@
+# import libraries
+import time
+import random
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+RATE_LIMIT_REASONS = {'rateLimitExceeded', 'userRateLimitExceeded'}  # Drive v2 sends them as 403
+
+
+# #############################################################################
+# ####### ———————- SHARED RATE LIMITER FOR API CALLS -——————— ################
+# #############################################################################
+class TokenBucket(object):
+    """ `rate` requests per `period` seconds, bursts up to `rate` """
+
+    def __init__(self, rate, period=60.0):
+        self.rate = rate  # configured rate, the current one may be lower after 429
+        self.current_rate = float(rate)
+        self.period = period
+        self.tokens = float(rate)
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.tokens = min(self.current_rate, self.tokens + (now - self.updated) * self.current_rate / self.period)
+        self.updated = now
+
+    def wait_time(self, now):
+        """ Seconds until a token is there (0 — take it now) """
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) * self.period / self.current_rate
+
+    def take(self):
+        self.tokens -= 1
+
+    def slow_down(self, factor=0.5, floor=0.1):
+        """ Throttled by the API: halve the rate and spend what is left in the bucket """
+        self.current_rate = max(self.rate * floor, self.current_rate * factor)
+        self.tokens = min(self.tokens, 0.0)
+
+    def speed_up(self, step=0.05):
+        self.current_rate = min(float(self.rate), self.current_rate + self.rate * step)
+
+
+def error_status(error):
+    """ (HTTP status, Retry-After seconds or None) of a gspread / googleapiclient / AsyncAPIError error,
+        (None, None) if unknown
+    """
+    response = getattr(error, 'response', None)  # gspread.exceptions.APIError
+    if response is not None and hasattr(response, 'status_code'):
+        return response.status_code, parse_retry_after(response.headers.get('Retry-After'))
+    resp = getattr(error, 'resp', None)  # googleapiclient.errors.HttpError
+    if resp is not None and hasattr(resp, 'status'):
+        return int(resp.status), parse_retry_after(resp.get('retry-after'))
+    if isinstance(getattr(error, 'status', None), int):  # AsyncAPIError
+        return error.status, getattr(error, 'retry_after', None)
+    return None, None
+
+
+def parse_retry_after(value):
+    """ Retry-After header -> seconds, None if absent or an HTTP date """
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None  # an HTTP date — backoff is used instead
+
+
+def is_retryable(error):
+    """ 429 / 5xx, a 403 with a rate limit reason, or a dropped connection """
+    status, _ = error_status(error)
+    if status in RETRYABLE_STATUSES:
+        return True
+    if status == 403:
+        return any(reason in str(error) for reason in RATE_LIMIT_REASONS)
+    if status is None:  # requests / httplib2 connection errors have no status
+        return isinstance(error, (ConnectionError, TimeoutError)) or \
+            type(error).__name__ in ('ConnectionError', 'Timeout', 'ReadTimeout', 'ConnectTimeout',
+                                     'ServerDisconnectedError', 'ClientConnectorError', 'ClientOSError')
+    return False
+
+
+def is_rejected(error):
+    """ 429 or a rate limit 403 — refused before it ran, safe to send again even if not idempotent """
+    status, _ = error_status(error)
+    return status == 429 or (status == 403 and any(reason in str(error) for reason in RATE_LIMIT_REASONS))
+
+
+class RateLimiter(object):
+    """ Token buckets per user (keyfile) and per project, shared by every GoogleSheetsObjects in the process
+
+    Every API call waits for a token in both buckets, retryable errors (429, 5xx, 403 rate limit)
+    are retried with exponential backoff and full jitter, `Retry-After` is honored.
+    A throttled reply slows the buckets down, successful calls bring the rate back.
+
+    How to call:
+    limiter = RateLimiter.shared()  # the default one
+    limiter.call(worksheet.get_all_values, user='<API key file.json>')
+    print(limiter.stats())
+    """
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, per_user=60, per_project=300, period=60.0,
+                 max_retries=6, base_delay=1.0, max_delay=64.0):
+        self.per_user = per_user  # requests per period per user (keyfile)
+        self.period = period
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.project = TokenBucket(per_project, period)
+        self.users = {}
+        self._lock = threading.Lock()
+        self.counters = {'calls': 0, 'retries': 0, 'failures': 0, 'throttled': 0,
+                         'throttle_seconds': 0.0, 'backoff_seconds': 0.0, 'queue_depth': 0, 'queue_peak': 0}
+
+    @classmethod
+    def shared(cls):
+        """ Process-wide limiter used when GoogleSheetsObjects gets none """
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    @classmethod
+    def set_shared(cls, limiter):
+        """ Replaces the process-wide limiter (e.g. with quotas of your project) """
+        with cls._shared_lock:
+            cls._shared = limiter
+
+    def _buckets(self, user):
+        if user not in self.users:
+            self.users[user] = TokenBucket(self.per_user, self.period)
+        return self.project, self.users[user]
+
+    def acquire(self, user=None):
+        """ Blocks until both buckets give a token, returns seconds waited """
+        waited = 0.0
+        with self._lock:
+            self.counters['queue_depth'] += 1
+            self.counters['queue_peak'] = max(self.counters['queue_peak'], self.counters['queue_depth'])
+        try:
+            while True:
+                with self._lock:
+                    buckets = self._buckets(user)
+                    now = time.monotonic()
+                    delay = max(bucket.wait_time(now) for bucket in buckets)
+                    if delay <= 0:
+                        for bucket in buckets:
+                            bucket.take()
+                        self.counters['throttle_seconds'] += waited
+                        return waited
+                time.sleep(delay)
+                waited += delay
+        finally:
+            with self._lock:
+                self.counters['queue_depth'] -= 1
+
+    def backoff(self, attempt, retry_after=None):
+        """ Full jitter: random(0, min(max_delay, base * 2^attempt)), at least Retry-After """
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        return max(delay, retry_after or 0.0)
+
+    def call(self, func, *args, user=None, retry_if=None, **kwargs):
+        """ Runs func(*args, **kwargs) within quota, retries retryable errors, re-raises the rest
+
+            retry_if — predicate of the errors to retry (default is_retryable), e.g. is_rejected for appends
+        """
+        retry_if = retry_if or is_retryable
+        for attempt in range(self.max_retries + 1):
+            self.acquire(user)
+            with self._lock:
+                self.counters['calls'] += 1
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                if not retry_if(e) or attempt == self.max_retries:
+                    with self._lock:
+                        self.counters['failures'] += 1
+                    raise
+                status, retry_after = error_status(e)
+                with self._lock:
+                    self.counters['retries'] += 1
+                    if status in (429, 403):
+                        self.counters['throttled'] += 1
+                        for bucket in self._buckets(user):
+                            bucket.slow_down()
+                delay = self.backoff(attempt, retry_after)
+                logger.warning(f"API error {status}, retry {attempt + 1}/{self.max_retries} in {delay:.1f}s: {e}")
+                with self._lock:
+                    self.counters['backoff_seconds'] += delay
+                time.sleep(delay)
+                continue
+            with self._lock:
+                for bucket in self._buckets(user):
+                    bucket.speed_up()
+            return result
+
+    def stats(self):
+        """ Counters, queue depth and current rates """
+        with self._lock:
+            result = dict(self.counters)
+            result['project_rate'] = round(self.project.current_rate, 2)
+            result['user_rates'] = {user: round(bucket.current_rate, 2) for user, bucket in self.users.items()}
+            return result
@@ -0,0 +1,120 @@
+# import libraries
+import time
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from .lazy import LazyModule
+from .ranges import range_to_a1, quote_title
+
+pd = LazyModule('pandas')
+
+logger = logging.getLogger(__name__)
+
+DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S'  # USER_ENTERED turns it into a date
+
+
+# #############################################################################
+# ####### ———————- BULK DATAFRAME WRITER -——————— ############################
+# #############################################################################
+def frame_to_rows(dataframe, header=True):
+    """ DataFrame -> list of rows ready for JSON, converted column by column (no per-cell branching)
+
+        numbers and booleans stay numbers, datetimes become 'YYYY-MM-DD HH:MM:SS',
+        everything else is str, NaN / None / NaT become ''.
+    """
+    columns = []
+    for _, column in dataframe.items():
+        missing = column.isna()
+        if pd.api.types.is_bool_dtype(column) or pd.api.types.is_numeric_dtype(column):
+            values = column.astype(object)
+        elif pd.api.types.is_datetime64_any_dtype(column):
+            values = column.dt.strftime(DATETIME_FORMAT).astype(object)
+        else:
+            values = column.astype(str).astype(object)
+        columns.append(values.where(~missing, '').tolist())
+    rows = [list(row) for row in zip(*columns)]
+    if header:
+        rows.insert(0, [str(name) for name in dataframe.columns])
+    return rows
+
+
+def split_by_size(rows, chunk_bytes):
+    """ Row blocks whose JSON is at most chunk_bytes (a single larger row makes a block alone)
+
+        returns [(first row offset, rows, bytes)]
+    """
+    blocks = []
+    start, size = 0, 0
+    for offset, row in enumerate(rows):
+        row_bytes = len(json.dumps(row, ensure_ascii=False).encode('utf-8')) + 1
+        if size and size + row_bytes > chunk_bytes:
+            blocks.append((start, rows[start:offset], size))
+            start, size = offset, 0
+        size += row_bytes
+    if size:
+        blocks.append((start, rows[start:], size))
+    return blocks
+
+
+class DataFrameWriter(object):
+    """ Uploads a large DataFrame in size-bounded row blocks, several blocks at a time
+
+    Used by GoogleSheet.write_dataframe, blocks that fail (after the rate limiter retries)
+    are sent again one by one, alone.
+    """
+
+    def __init__(self, data_source, chunk_bytes=2 * 1024 * 1024, max_parallel=4, retries=2,
+                 value_input_option='USER_ENTERED'):
+        self.data_source = data_source  # GoogleSheetsObjects with opened file
+        self.chunk_bytes = chunk_bytes
+        self.max_parallel = max_parallel
+        self.retries = retries
+        self.value_input_option = value_input_option
+
+    def _send(self, title, row, col, block):
+        offset, rows, _ = block
+        width = max(len(line) for line in rows)
+        sheet_range = f"{quote_title(title)}!{range_to_a1((row + offset, col, row + offset + len(rows) - 1, col + width - 1))}"
+        return self.data_source.api_call(self.data_source.wks.values_update, sheet_range,
+                                         params={'valueInputOption': self.value_input_option},
+                                         body={'values': rows})
+
+    def write(self, google_sheet_pointer, rows, row=1, col=1):
+        """ Writes rows with the top left corner at (row, col), returns report """
+        started = time.monotonic()
+        report = {'rows': len(rows), 'blocks': 0, 'bytes': 0, 'requests': 0, 'retried_blocks': 0,
+                  'failed_blocks': [], 'seconds': 0.0, 'rows_per_second': 0.0}
+        if not rows:
+            return report
+        width = max(len(line) for line in rows)
+        self.data_source.ensureGridSize(google_sheet_pointer, row + len(rows) - 1, col + width - 1)
+        blocks = split_by_size(rows, self.chunk_bytes)
+        report['blocks'] = len(blocks)
+        report['bytes'] = sum(block[2] for block in blocks)
+        title = google_sheet_pointer.title
+
+        def send(block):
+            try:
+                self._send(title, row, col, block)
+                return None
+            except Exception as e:
+                logger.warning(f"Block at row {row + block[0]} failed: {e}")
+                return block
+
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_parallel, len(blocks)))) as pool:
+            failed = [block for block in pool.map(send, blocks) if block is not None]
+        report['requests'] = len(blocks)
+        for attempt in range(self.retries):  # failed blocks again, one at a time
+            if not failed:
+                break
+            report['retried_blocks'] += len(failed)
+            report['requests'] += len(failed)
+            failed = [block for block in map(send, failed) if block is not None]
+        report['failed_blocks'] = [range_to_a1((row + offset, col, row + offset + len(block_rows) - 1,
+                                                col + max(len(line) for line in block_rows) - 1))
+                                   for offset, block_rows, _ in failed]
+        report['seconds'] = round(time.monotonic() - started, 3)
+        written = report['rows'] - sum(len(block[1]) for block in failed)
+        report['rows_per_second'] = round(written / report['seconds'], 1) if report['seconds'] else float(written)
+        return report
@@ -0,0 +1,158 @@
+#!/usr/bin/python3
+""" Reproducible performance benchmark against the in-process fake Sheets / Drive (agg_spreads.fake)
+
+    ~$ python3 benchmarks/bench.py --sizes 1000,100000 --latency 0.05
+    ~$ python3 benchmarks/bench.py --scenarios get_all_values,write_dataframe --json results.json
+
+    Every scenario x size runs in its own process (clean peak RSS), the tab holds `size` cells
+    in 10 columns. Reports wall time, API calls, bytes sent / received and peak RSS.
+    No network, no credentials — results are comparable between commits.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import importlib
+import resource
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SIZES = [1000, 10000, 100000, 1000000, 5000000]
+COLUMNS = 10
+COLORED = 100  # cells colored by the color scenarios
+
+
+def sample_rows(size):
+    rows = [[f'col{c}' for c in range(COLUMNS)]]
+    rows.extend([[r * COLUMNS + c if c % 2 else f'v{r}.{c}' for c in range(COLUMNS)]
+                 for r in range(max(1, size // COLUMNS) - 1)])
+    return rows
+
+
+# ——————————————————————————— SCENARIOS ———————————————————————————
+def get_all_values(table, rows):
+    table.get_all_values()
+
+
+def dataframe_full(table, rows):
+    table.read_sheet_to_dataframe()
+
+
+def dataframe_range(table, rows):
+    table.read_sheet_to_dataframe(range_a1=f'A1:J{len(rows)}')
+
+
+def dataframe_corner(table, rows):
+    table.read_sheet_to_dataframe(corner='A1', width=COLUMNS, heigh=len(rows))
+
+
+def read_dict(table, rows):
+    table.read_sheet_to_dict()
+
+
+def update_by_corner(table, rows):
+    table.update_range_by_corner('A1', rows)
+
+
+def write_dataframe(table, rows):
+    import pandas as pd
+    table.write_dataframe(pd.DataFrame(rows[1:], columns=rows[0]))
+
+
+def color_loop(table, rows):
+    for line in range(2, COLORED + 2):
+        table.updateRangeColor(column1='A', line1=line, column2='A', line2=line)
+
+
+def color_batch(table, rows):
+    with table.batch():
+        color_loop(table, rows)
+
+
+def provision(table, rows):
+    from agg_spreads import GoogleSheet
+    GoogleSheet(keyfile=table.data_source.keyfile, title='Provisioned', email='team@example.com',
+                pool=table.data_source.pool, limiter=table.data_source.limiter)
+
+
+SCENARIOS = {function.__name__: function for function in (
+    get_all_values, dataframe_full, dataframe_range, dataframe_corner, read_dict,
+    update_by_corner, write_dataframe, color_loop, color_batch, provision)}
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)  # bytes on macOS, KiB on Linux
+
+
+def run_one(scenario, size, latency, keyfile):
+    """ One scenario in this process, returns the result dict """
+    sys.path.insert(0, ROOT)
+    from agg_spreads import GoogleSheet, RateLimiter
+    from agg_spreads.fake import FakeGoogle
+    importlib.import_module('pandas')  # preloaded: the lazy pandas import is not part of any scenario time
+
+    fake = FakeGoogle(latency=latency, seed=0)
+    rows = sample_rows(size)
+    sheet_id = fake.create_spreadsheet('Benchmark', tabs=['Data'], rows=len(rows), cols=COLUMNS)
+    if not scenario.startswith(('update', 'write')):
+        fake.set_values(sheet_id, 'Data', rows)
+    limiter = RateLimiter(per_user=10 ** 9, per_project=10 ** 9)  # measure the client, not the limiter
+    table = GoogleSheet(keyfile=keyfile, sheetID=sheet_id, tab_name='Data', pool=fake.pool(), limiter=limiter)
+    baseline = peak_rss_mb()
+    fake.reset_stats()
+    started = time.perf_counter()
+    SCENARIOS[scenario](table, rows)
+    seconds = time.perf_counter() - started
+    stats = fake.stats()
+    return {'scenario': scenario, 'cells': len(rows) * COLUMNS, 'latency': latency,
+            'seconds': round(seconds, 4), 'api_calls': stats['requests'],
+            'bytes_sent': stats['bytes_in'], 'bytes_received': stats['bytes_out'],
+            'baseline_rss_mb': baseline, 'peak_rss_mb': peak_rss_mb(), 'endpoints': stats['by_endpoint']}
+
+
+def run_isolated(scenario, size, latency, keyfile):
+    command = [sys.executable, os.path.abspath(__file__), '--one', scenario, '--sizes', str(size),
+               '--latency', str(latency), '--keyfile', keyfile]
+    completed = subprocess.run(command, capture_output=True, text=True)
+    if completed.returncode:
+        return {'scenario': scenario, 'cells': size, 'error': completed.stderr.strip().splitlines()[-1:]}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='agg_spreads benchmark on the fake Sheets / Drive')
+    parser.add_argument('--sizes', default=','.join(map(str, SIZES)), help='cells per tab, comma separated')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS), help='comma separated, default all')
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every request')
+    parser.add_argument('--keyfile', default='benchmark.json', help='any name, never read by the fake')
+    parser.add_argument('--json', help='write the results to this file')
+    parser.add_argument('--one', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(',')]
+
+    if args.one:
+        print(json.dumps(run_one(args.one, sizes[0], args.latency, args.keyfile)))
+        return 0
+
+    results = []
+    print(f"{'scenario':<18}{'cells':>10}{'seconds':>10}{'calls':>7}{'sent KB':>10}{'recv KB':>10}{'peak MB':>9}")
+    for scenario in args.scenarios.split(','):
+        for size in sizes:
+            result = run_isolated(scenario, size, args.latency, args.keyfile)
+            results.append(result)
+            if 'error' in result:
+                print(f"{scenario:<18}{size:>10}  FAILED: {' '.join(result['error'])}")
+                continue
+            print(f"{scenario:<18}{result['cells']:>10}{result['seconds']:>10.3f}{result['api_calls']:>7}"
+                  f"{result['bytes_sent'] / 1024:>10.1f}{result['bytes_received'] / 1024:>10.1f}"
+                  f"{result['peak_rss_mb']:>9.1f}")
+    if args.json:
+        with open(args.json, 'w') as output:
+            json.dump(results, output, indent=2)
+    return 1 if any('error' in result for result in results) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,63 @@
+#!/usr/bin/python3
+""" Import-time guard: `import agg_spreads` must stay fast and free of side effects
+
+    ~$ python3 benchmarks/import_time.py --runs 7 --budget 0.15
+
+    Fails (exit code 1) if the median import takes longer than the budget (seconds),
+    if a heavy library gets imported, or if the import creates files in the package directory.
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+HEAVY = ['pandas', 'numpy', 'gspread', 'googleapiclient', 'oauth2client', 'aiohttp', 'asyncio']
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PACKAGE = os.path.join(ROOT, 'agg_spreads')
+
+PROBE = """
+import sys, time, json
+started = time.perf_counter()
+import agg_spreads
+seconds = time.perf_counter() - started
+print(json.dumps({'seconds': seconds, 'loaded': [name for name in %r if name in sys.modules]}))
+""" % (HEAVY,)
+
+
+def run_once():
+    env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get('PYTHONPATH', ''))
+    output = subprocess.run([sys.executable, '-c', PROBE], env=env, check=True,
+                            capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='agg_spreads import-time benchmark')
+    parser.add_argument('--runs', type=int, default=7)
+    parser.add_argument('--budget', type=float, default=0.15, help='max median import time, seconds')
+    args = parser.parse_args()
+
+    files_before = set(os.listdir(PACKAGE))
+    results = [run_once() for _ in range(args.runs)]
+    new_files = sorted(set(os.listdir(PACKAGE)) - files_before - {'__pycache__'})
+    median = statistics.median(result['seconds'] for result in results)
+    loaded = sorted({name for result in results for name in result['loaded']})
+
+    print(f"import agg_spreads: median {median * 1000:.1f} ms over {args.runs} runs "
+          f"(min {min(r['seconds'] for r in results) * 1000:.1f} ms, budget {args.budget * 1000:.0f} ms)")
+    failures = []
+    if median > args.budget:
+        failures.append(f"median import time {median:.3f}s is over budget {args.budget:.3f}s")
+    if loaded:
+        failures.append(f"heavy modules imported eagerly: {', '.join(loaded)}")
+    if new_files:
+        failures.append(f"import created files: {', '.join(new_files)}")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -7,6 +7,12 @@ setuptools.setup(
     description="One more gspread wraper to work with Google Sheets",
     packages=["agg_spreads"],
     install_requires=[
-        'google-api-python-client',
+        'google-api-python-client>=2.0',  # ships the Drive v2 discovery document
+        'gspread>=5.0',
+        'oauth2client',
         'pandas',
-    ])
+    ],
+    extras_require={
+        'async': ['aiohttp'],
+        'arrow': ['pyarrow'],
+    })
@@ -0,0 +1,43 @@
+import pandas as pd
+
+from agg_spreads import GoogleSheet, RateLimiter
+from agg_spreads.fake import FakeGoogle
+
+
+def make_table(fake, spreadsheet_id):
+    return GoogleSheet(keyfile='key.json', sheetID=spreadsheet_id, pool=fake.pool(),
+                       limiter=RateLimiter(10 ** 9, 10 ** 9))
+
+
+def test_first_sync_keeps_cells_next_to_the_frame():
+    fake = FakeGoogle()
+    spreadsheet_id = fake.create_spreadsheet('Report', tabs=['Data'], rows=20, cols=10)
+    fake.set_values(spreadsheet_id, 'Data', [['note 1'], ['note 2']], corner='H1')
+    fake.set_values(spreadsheet_id, 'Data', [['old']], corner='A6')
+    report = make_table(fake, spreadsheet_id).sync_dataframe(pd.DataFrame({'a': [1, 2], 'b': [3, 4]}), 'A1')
+    values = fake.get_values(spreadsheet_id, 'Data')
+    assert [values[0][7], values[1][7]] == ['note 1', 'note 2']
+    assert values[5][0] == 'old'
+    assert report['bytes_saved'] >= 0
+
+
+def test_clear_extent_empties_a_larger_earlier_frame():
+    fake = FakeGoogle()
+    spreadsheet_id = fake.create_spreadsheet('Report', tabs=['Data'], rows=20, cols=10)
+    make_table(fake, spreadsheet_id).sync_dataframe(pd.DataFrame({'a': range(5), 'b': range(5)}), 'A1')
+    table = make_table(fake, spreadsheet_id)  # a new run, no grid of the last sync
+    table.sync_dataframe(pd.DataFrame({'a': [7]}), 'A1', clear_extent=(6, 2))
+    values = fake.get_values(spreadsheet_id, 'Data')
+    assert values == [['a'], [7]]  # trailing empty cells and rows are trimmed
+
+
+def test_later_sync_empties_cells_of_a_shrunk_frame():
+    fake = FakeGoogle()
+    spreadsheet_id = fake.create_spreadsheet('Report', tabs=['Data'], rows=20, cols=10)
+    fake.set_values(spreadsheet_id, 'Data', [['keep']], corner='H1')
+    table = make_table(fake, spreadsheet_id)
+    table.sync_dataframe(pd.DataFrame({'a': range(4)}), 'A1')
+    table.sync_dataframe(pd.DataFrame({'a': range(2)}), 'A1')
+    values = fake.get_values(spreadsheet_id, 'Data')
+    assert all(not line[0] for line in values[3:5])
+    assert values[0][7] == 'keep'